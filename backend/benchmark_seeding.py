@@ -0,0 +1,254 @@
+import psycopg2
+import numpy as np
+import os
+import sys
+import json
+import time
+import platform
+import datetime
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import seed_weather_data as seeder
+
+# Stages each table's load is split into; the null sink stops after serialization
+STAGES = ('generation', 'serialization', 'transfer', 'commit')
+
+def current_rss():
+    """Resident set size of this process in bytes"""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        import resource
+        # Peak rather than current where /proc is missing; ru_maxrss is bytes on macOS, KiB elsewhere
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+class StageStats:
+    """Seconds, rows, bytes and peak RSS per (table, stage) within one process"""
+
+    def __init__(self):
+        self.tables = {}
+
+    def add(self, table, stage, seconds, rows=0, byte_count=0):
+        stats = self.tables.setdefault(table, {}).setdefault(
+            stage, dict(seconds=0.0, rows=0, bytes=0, peak_rss=0))
+        stats['seconds'] += seconds
+        stats['rows'] += rows
+        stats['bytes'] += byte_count
+        stats['peak_rss'] = max(stats['peak_rss'], current_rss())
+
+    def seconds(self, table, stages):
+        return sum(self.tables.get(table, {}).get(stage, {}).get('seconds', 0.0) for stage in stages)
+
+def timed_chunks(stats, table, chunks, copy_format):
+    """Generate and serialize chunks one at a time, charging each step to its stage.
+
+    Serialization includes the content hash CopyStream keeps for every chunk.
+    """
+    chunks = iter(chunks)
+    while True:
+        start_time = time.perf_counter()
+        chunk = next(chunks, None)
+        if chunk is None:
+            stats.add(table, 'generation', time.perf_counter() - start_time)
+            return
+        stats.add(table, 'generation', time.perf_counter() - start_time, chunk.row_count)
+
+        start_time = time.perf_counter()
+        payload = chunk.encode(copy_format)
+        content_hash = chunk.content_hash()
+        stats.add(table, 'serialization', time.perf_counter() - start_time, chunk.row_count, len(payload))
+        yield seeder.EncodedChunk(payload, chunk.row_count, content_hash)
+
+def bench_table(stats, conn, table, chunks, copy_format):
+    """Load one table's chunks into conn, or drain them into nothing when conn is None.
+
+    Transfer is the COPY's duration minus the generation and serialization
+    done while it ran, so it covers the wire and the server-side insert;
+    commit is the final COMMIT (WAL flush) alone.
+    """
+    stream = seeder.CopyStream(timed_chunks(stats, table, chunks, copy_format), copy_format)
+    if conn is None:
+        while stream.read(seeder.COPY_CHUNK_SIZE):
+            pass
+        return stream.row_count
+
+    cursor = conn.cursor()
+    produced = stats.seconds(table, ('generation', 'serialization'))
+    start_time = time.perf_counter()
+    cursor.copy_expert(
+        f"COPY {table} ({', '.join(seeder.COPY_COLUMNS[table])}) FROM STDIN WITH (FORMAT {copy_format})",
+        stream, size=seeder.COPY_CHUNK_SIZE
+    )
+    produced = stats.seconds(table, ('generation', 'serialization')) - produced
+    stats.add(table, 'transfer', time.perf_counter() - start_time - produced, stream.row_count, stream.byte_count)
+
+    start_time = time.perf_counter()
+    conn.commit()
+    stats.add(table, 'commit', time.perf_counter() - start_time, stream.row_count)
+    cursor.close()
+    return stream.row_count
+
+def bench_partition(db_params, tables, catalogue, months, copy_format, as_of):
+    """Run the tables for one range of cities in a worker process; returns its stage stats"""
+    stats = StageStats()
+    conn = seeder.connect(db_params) if db_params else None
+    try:
+        for table in tables:
+            bench_table(stats, conn, table, seeder.generate_table_chunks(table, catalogue, months, as_of), copy_format)
+    finally:
+        if conn is not None:
+            conn.close()
+    return stats.tables
+
+def merge_stage_stats(results):
+    """Sum the workers' stage stats per table and stage (peak RSS is the largest worker's)"""
+    merged = {}
+    for tables in results:
+        for table, stages in tables.items():
+            for stage, stats in stages.items():
+                total = merged.setdefault(table, {}).setdefault(
+                    stage, dict(seconds=0.0, rows=0, bytes=0, peak_rss=0))
+                for field in ('seconds', 'rows', 'bytes'):
+                    total[field] += stats[field]
+                total['peak_rss'] = max(total['peak_rss'], stats['peak_rss'])
+
+    for stages in merged.values():
+        for stats in stages.values():
+            seconds = max(stats['seconds'], 1e-9)
+            stats['rows_per_sec'] = stats['rows'] / seconds
+            stats['bytes_per_sec'] = stats['bytes'] / seconds
+            stats['peak_rss_mb'] = stats.pop('peak_rss') / 1e6
+    return merged
+
+def run_config(db_params, sink, city_count, months, workers, copy_format, seed, as_of):
+    """Seed one configuration into the sink and return its result record"""
+    catalogue = seeder.CityCatalogue(city_count, seed=seed)
+    partitions = catalogue.split(workers)
+    target = db_params if sink == 'postgres' else None
+    if target:
+        conn = seeder.connect(target)
+        seeder.truncate_tables(conn, list(seeder.COPY_COLUMNS))
+        conn.close()
+
+    results = []
+    start_time = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=len(partitions)) as pool:
+        # Locations first so the weather tables' foreign keys hold
+        for tables in (['locations'], seeder.FOREIGN_KEY_TABLES):
+            futures = [pool.submit(bench_partition, target, tables, partition, months, copy_format, as_of)
+                       for partition in partitions]
+            results.extend(future.result() for future in futures)
+    wall_seconds = time.perf_counter() - start_time
+
+    tables = merge_stage_stats(results)
+    rows = sum(stages['generation']['rows'] for stages in tables.values())
+    return dict(
+        sink=sink, city_count=city_count, months=months, workers=workers, copy_format=copy_format,
+        rows=rows, wall_seconds=wall_seconds, rows_per_sec=rows / max(wall_seconds, 1e-9), tables=tables,
+    )
+
+def print_result(result):
+    print(f"\n----- {result['sink']}: {result['city_count']} cities, {result['months']} months, "
+          f"{result['workers']} workers, {result['copy_format']} -----")
+    print(f"{result['rows']} rows in {result['wall_seconds']:.2f} seconds ({result['rows_per_sec']:,.0f} rows/sec)")
+    print(f"{'table':<18}{'stage':<15}{'seconds':>10}{'rows/sec':>14}{'MB/sec':>10}{'peak RSS MB':>13}")
+    for table, stages in result['tables'].items():
+        for stage in STAGES:
+            if stage in stages:
+                stats = stages[stage]
+                print(f"{table:<18}{stage:<15}{stats['seconds']:>10.2f}{stats['rows_per_sec']:>14,.0f}"
+                      f"{stats['bytes_per_sec'] / 1e6:>10.1f}{stats['peak_rss_mb']:>13.1f}")
+
+def create_throwaway_database(db_params, maintenance_db):
+    """Create an empty database with the seeding schema; returns its connection parameters"""
+    name = f"seed_benchmark_{os.getpid()}"
+    conn = psycopg2.connect(**dict(db_params, dbname=maintenance_db))
+    conn.autocommit = True
+    cursor = conn.cursor()
+    cursor.execute(f"CREATE DATABASE {name}")
+    conn.close()
+
+    params = dict(db_params, dbname=name)
+    conn = seeder.connect(params)
+    seeder.create_schema(conn)
+    server_version = conn.server_version
+    conn.close()
+    return params, server_version
+
+def drop_database(db_params, maintenance_db, name):
+    conn = psycopg2.connect(**dict(db_params, dbname=maintenance_db))
+    conn.autocommit = True
+    conn.cursor().execute(f"DROP DATABASE IF EXISTS {name}")
+    conn.close()
+
+def int_list(value):
+    return [int(item) for item in value.split(',')]
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark weather data seeding per table and stage.')
+    parser.add_argument('--host', default='localhost', help='Database host')
+    parser.add_argument('--port', type=int, default=5433, help='Database port')
+    parser.add_argument('--user', default='koko', help='Database user')
+    parser.add_argument('--password', default='password', help='Database password')
+    parser.add_argument('--maintenance-db', default='postgres',
+                        help='Database to connect to while creating and dropping the throwaway database')
+    parser.add_argument('--city-counts', type=int_list, default=[1000, 10000], help='Comma-separated city counts')
+    parser.add_argument('--months', type=int_list, default=[12], help='Comma-separated months of daily data')
+    parser.add_argument('--workers', type=int_list, default=[1], help='Comma-separated worker counts')
+    parser.add_argument('--copy-formats', default='text,binary', help='Comma-separated COPY formats (text, csv, binary)')
+    parser.add_argument('--sink', choices=['null', 'postgres', 'both'], default='both',
+                        help='Discard generated data (generation-only numbers), load a throwaway database, or both')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed for the generated data')
+    parser.add_argument('--output', default='seeding_benchmark.json', help="JSON results file ('-' for stdout)")
+
+    args = parser.parse_args()
+
+    db_params = dict(host=args.host, port=args.port, user=args.user, password=args.password)
+    sinks = ['null', 'postgres'] if args.sink == 'both' else [args.sink]
+    as_of = datetime.datetime(2024, 1, 1)
+
+    report = dict(
+        started=datetime.datetime.now().isoformat(timespec='seconds'),
+        python=platform.python_version(),
+        numpy=np.__version__,
+        cpu_count=os.cpu_count(),
+        seed=args.seed,
+        results=[],
+    )
+
+    throwaway = None
+    try:
+        if 'postgres' in sinks:
+            throwaway, report['server_version'] = create_throwaway_database(db_params, args.maintenance_db)
+            print(f"Created throwaway database {throwaway['dbname']}")
+
+        for sink in sinks:
+            for city_count in args.city_counts:
+                for months in args.months:
+                    for workers in args.workers:
+                        for copy_format in args.copy_formats.split(','):
+                            result = run_config(throwaway, sink, city_count, months, workers,
+                                                copy_format, args.seed, as_of)
+                            print_result(result)
+                            report['results'].append(result)
+    except Exception as e:
+        print(f"Error: {e}")
+        return 1
+    finally:
+        if throwaway:
+            drop_database(db_params, args.maintenance_db, throwaway['dbname'])
+
+    if args.output == '-':
+        print(json.dumps(report, indent=2))
+    else:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2)
+        print(f"\nWrote {len(report['results'])} results to {args.output}")
+
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
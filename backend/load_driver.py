@@ -0,0 +1,374 @@
+import numpy as np
+import json
+import time
+import asyncio
+import datetime
+import argparse
+import collections
+from urllib.parse import urlsplit
+
+import seed_weather_data as seeder
+
+# Read endpoints of the Spring controllers, keyed by the names used in --mix
+ENDPOINTS = {
+    'location': '/api/v1/locations/{code}',
+    'realtime': '/api/v1/realtime/{code}',
+    'hourly': '/api/v1/hourly/{code}',
+    'daily': '/api/v1/daily/{code}',
+    'full': '/api/v1/full/{code}',
+}
+
+# Enabled and disabled locations are served alike; trashed and missing ones are not found
+KEY_CLASSES = ('enabled', 'disabled', 'trashed', 'missing')
+FOUND_CLASSES = ('enabled', 'disabled')
+
+# Requests planned per batch of key draws
+PLAN_BATCH = 4096
+
+def parse_mix(value):
+    """'realtime=3,full=1' as {endpoint: weight}"""
+    mix = {}
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        if name not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"unknown endpoint {name!r} (choose from {', '.join(ENDPOINTS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+def catalogue_flags(catalogue):
+    """Enabled and trashed flags of every catalogue city, as the seeder wrote them"""
+    enabled, trashed = [], []
+    for block in catalogue.blocks():
+        block_enabled, block_trashed = seeder.location_flags(catalogue.seed, block)
+        enabled.append(block_enabled)
+        trashed.append(block_trashed)
+    return np.concatenate(enabled), np.concatenate(trashed)
+
+class RequestPlan:
+    """An endless, seeded stream of (endpoint, code, key class) requests.
+
+    Found keys are drawn uniformly (skew 0) or Zipf-skewed over a fixed
+    shuffle of the untrashed cities, so a few hot codes take most of the
+    traffic; miss_ratio of the requests go to trashed codes or to codes
+    past the end of the catalogue, split by trashed_share.
+    """
+
+    def __init__(self, catalogue, mix, skew=1.0, miss_ratio=0.1, trashed_share=0.5, missing_codes=1000):
+        self.catalogue = catalogue
+        self.endpoints = list(mix)
+        weights = np.array([mix[name] for name in self.endpoints], dtype=np.float64)
+        self.weights = weights / weights.sum()
+        self.skew = skew
+        self.miss_ratio = miss_ratio
+        self.trashed_share = trashed_share
+        self.rng = np.random.default_rng(catalogue.seed)
+
+        enabled, trashed = catalogue_flags(catalogue)
+        self.enabled = enabled
+        self.found = catalogue.start + np.flatnonzero(~trashed)
+        self.trashed = catalogue.start + np.flatnonzero(trashed)
+        self.missing = np.arange(catalogue.count, min(catalogue.count + missing_codes, seeder.MAX_CITY_COUNT))
+        self.stride = seeder._coprime_stride(len(self.found))
+        self.pending = collections.deque()
+
+    def _batch(self, size):
+        rng = self.rng
+        endpoints = rng.choice(len(self.endpoints), size, p=self.weights)
+        miss = rng.random(size) < self.miss_ratio
+        trashed = miss & (rng.random(size) < self.trashed_share) & (len(self.trashed) > 0)
+        missing = miss & ~trashed
+
+        ranks = seeder.zipf_ranks(rng, len(self.found), self.skew, size)
+        index = self.found[ranks * self.stride % len(self.found)]
+        if len(self.trashed):
+            index = np.where(trashed, self.trashed[rng.integers(0, len(self.trashed), size)], index)
+        index = np.where(missing, self.missing[rng.integers(0, len(self.missing), size)], index)
+
+        # Codes past the catalogue are generated the same way, so they look real but were never seeded
+        codes = self.catalogue.select(index).codes
+        classes = np.full(size, KEY_CLASSES.index('missing'))
+        seeded = ~missing
+        classes[seeded] = np.where(trashed[seeded], KEY_CLASSES.index('trashed'),
+                                   np.where(self.enabled[index[seeded] - self.catalogue.start],
+                                            KEY_CLASSES.index('enabled'), KEY_CLASSES.index('disabled')))
+        for endpoint, code, key_class in zip(endpoints.tolist(), codes, classes.tolist()):
+            self.pending.append((self.endpoints[endpoint], code, KEY_CLASSES[key_class]))
+
+    def next(self):
+        if not self.pending:
+            self._batch(PLAN_BATCH)
+        return self.pending.popleft()
+
+class HttpConnection:
+    """A minimal keep-alive HTTP/1.1 client connection over asyncio streams"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def request(self, path, headers=None):
+        """GET path and return (status, body bytes), reconnecting if the server closed the connection"""
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+        lines = [f"GET {path} HTTP/1.1", f"Host: {self.host}:{self.port}", "Accept: application/json"]
+        lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+        self.writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("connection closed by server")
+        status = int(status_line.split()[1])
+        response_headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            response_headers[name.strip().lower()] = value.strip()
+
+        if response_headers.get('transfer-encoding', '').lower() == 'chunked':
+            body = []
+            while True:
+                size = int((await self.reader.readline()).split(b';')[0], 16)
+                if size == 0:
+                    await self.reader.readline()
+                    break
+                body.append(await self.reader.readexactly(size))
+                await self.reader.readline()
+            body = b''.join(body)
+        else:
+            body = await self.reader.readexactly(int(response_headers.get('content-length', 0)))
+
+        if response_headers.get('connection', '').lower() == 'close':
+            await self.close()
+        return status, body
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except ConnectionError:
+                pass
+        self.reader = self.writer = None
+
+def expected_status(key_class, status):
+    """Whether a status is what the API should answer for a key of this class (204 is an empty forecast)"""
+    if key_class in FOUND_CLASSES:
+        return 200 <= status < 300
+    return status == 404
+
+class EndpointStats:
+    """Latencies and status codes per endpoint, and found/not-found answers per key class"""
+
+    def __init__(self):
+        self.latencies = collections.defaultdict(list)
+        self.statuses = collections.defaultdict(collections.Counter)
+        self.classes = collections.defaultdict(collections.Counter)
+        self.unexpected = collections.Counter()
+
+    def add(self, endpoint, key_class, status, seconds):
+        self.latencies[endpoint].append(seconds)
+        self.statuses[endpoint][status] += 1
+        self.classes[key_class]['requests'] += 1
+        if isinstance(status, int) and 200 <= status < 300:
+            self.classes[key_class]['found'] += 1
+        if not isinstance(status, int) or not expected_status(key_class, status):
+            self.unexpected[endpoint] += 1
+
+async def drive(host, port, plan, concurrency, requests=0, duration=0, hour=None):
+    """Issue the plan's requests from `concurrency` connections until requests or duration runs out"""
+    stats = EndpointStats()
+    issued = 0
+    deadline = time.perf_counter() + duration if duration else None
+    headers = {'X-Current-Hour': hour if hour is not None else datetime.datetime.now().hour}
+
+    async def worker():
+        nonlocal issued
+        connection = HttpConnection(host, port)
+        try:
+            while (not requests or issued < requests) and (deadline is None or time.perf_counter() < deadline):
+                issued += 1
+                endpoint, code, key_class = plan.next()
+                start_time = time.perf_counter()
+                try:
+                    status, _ = await connection.request(ENDPOINTS[endpoint].format(code=code),
+                                                         headers if endpoint == 'hourly' else None)
+                except (OSError, ValueError, IndexError, asyncio.IncompleteReadError) as e:
+                    status = type(e).__name__
+                    await connection.close()
+                stats.add(endpoint, key_class, status, time.perf_counter() - start_time)
+        finally:
+            await connection.close()
+
+    start_time = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return stats, time.perf_counter() - start_time
+
+def report(stats, wall_seconds):
+    """Per-endpoint throughput and latency percentiles, plus answers per key class"""
+    results = dict(wall_seconds=wall_seconds, endpoints={}, key_classes={})
+    print(f"\n----- Load Driver ({wall_seconds:.1f} seconds) -----")
+    print(f"{'endpoint':<10}{'requests':>10}{'req/sec':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+          f"{'unexpected':>12}  statuses")
+    for endpoint, latencies in sorted(stats.latencies.items()):
+        result = dict(
+            requests=len(latencies), requests_per_sec=len(latencies) / max(wall_seconds, 1e-9),
+            p50_ms=seeder.percentile(latencies, 0.5) * 1000, p95_ms=seeder.percentile(latencies, 0.95) * 1000,
+            p99_ms=seeder.percentile(latencies, 0.99) * 1000, unexpected=stats.unexpected[endpoint],
+            statuses={str(status): count for status, count in stats.statuses[endpoint].items()},
+        )
+        results['endpoints'][endpoint] = result
+        statuses = ' '.join(f"{status}:{count}" for status, count in sorted(result['statuses'].items()))
+        print(f"{endpoint:<10}{result['requests']:>10}{result['requests_per_sec']:>10,.0f}{result['p50_ms']:>9.2f}"
+              f"{result['p95_ms']:>9.2f}{result['p99_ms']:>9.2f}{result['unexpected']:>12}  {statuses}")
+
+    total = sum(len(latencies) for latencies in stats.latencies.values())
+    print(f"{'all':<10}{total:>10}{total / max(wall_seconds, 1e-9):>10,.0f}")
+
+    print(f"\n{'key class':<10}{'requests':>10}{'found':>10}")
+    for key_class in KEY_CLASSES:
+        counts = stats.classes[key_class]
+        if counts['requests']:
+            results['key_classes'][key_class] = dict(counts)
+            print(f"{key_class:<10}{counts['requests']:>10}{counts['found'] / counts['requests']:>10.1%}")
+    return results
+
+class StubServer:
+    """A stand-in for the Spring backend answering the read endpoints from the seeded catalogue.
+
+    Untrashed codes get a small JSON body, trashed and unknown ones a 404;
+    hourly forecasts need the X-Current-Hour header and are empty (204)
+    after the last hour, as in HourlyWeatherController.
+    """
+
+    def __init__(self, catalogue, latency=0.0):
+        self.latency = latency
+        _, trashed = catalogue_flags(catalogue)
+        self.found = set()
+        position = 0
+        for block in catalogue.blocks():
+            flags = trashed[position:position + len(block)]
+            self.found.update(code for code, is_trashed in zip(block.codes, flags.tolist()) if not is_trashed)
+            position += len(block)
+        self.prefixes = {template.rsplit('/', 1)[0] + '/': name for name, template in ENDPOINTS.items()}
+
+    def respond(self, path, headers):
+        prefix, _, code = path.rpartition('/')
+        endpoint = self.prefixes.get(prefix + '/')
+        if endpoint is None:
+            return 404, {'error': f"no endpoint {path}"}
+        if code not in self.found:
+            return 404, {'error': f"Location not found with the given code: {code}"}
+        if endpoint == 'hourly':
+            try:
+                hour = int(headers.get('x-current-hour', ''))
+            except ValueError:
+                return 400, None
+            if hour >= 23:
+                return 204, None
+        return 200, {'endpoint': endpoint, 'location_code': code}
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                status, document = self.respond(request_line.split()[1].decode('latin-1'), headers)
+                body = json.dumps(document).encode('utf-8') if document is not None else b''
+                writer.write(f"HTTP/1.1 {status} Stub\r\nContent-Type: application/json\r\n"
+                             f"Content-Length: {len(body)}\r\n\r\n".encode('latin-1') + body)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host, port):
+        return await asyncio.start_server(self.handle, host, port)
+
+async def run(args, catalogue, mix):
+    url = urlsplit(args.url)
+    host, port = url.hostname, url.port or 80
+    server = None
+    if args.stub:
+        print(f"Starting a stub backend on {host}:{port}...")
+        server = await StubServer(catalogue, args.stub_latency / 1000).start(host, port)
+
+    try:
+        plan = RequestPlan(catalogue, mix, args.skew, args.miss_ratio, args.trashed_share)
+        print(f"Driving {args.url} with {args.concurrency} connections: "
+              f"{', '.join(f'{name}={weight:g}' for name, weight in mix.items())}, "
+              f"skew {args.skew}, miss ratio {args.miss_ratio}")
+        return await drive(host, port, plan, args.concurrency, args.requests, args.duration, args.hour)
+    finally:
+        if server is not None:
+            server.close()
+            await server.wait_closed()
+
+def main():
+    parser = argparse.ArgumentParser(description='Drive read traffic at the weather API using the seeded catalogue.')
+    parser.add_argument('--url', default='http://localhost:8080', help='Backend base URL')
+    parser.add_argument('--city-count', type=int, default=2000, help='City count the database was seeded with')
+    parser.add_argument('--seed', type=int, required=True, help='Seed the database was seeded with')
+    parser.add_argument('--country-skew', type=float, default=1.0, help='--country-skew the database was seeded with')
+    parser.add_argument('--region-skew', type=float, default=0.8, help='--region-skew the database was seeded with')
+    parser.add_argument('--climate-bias', type=float, default=0.7, help='--climate-bias the database was seeded with')
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix('location=1,realtime=3,hourly=2,daily=2,full=2'),
+                        help='Comma-separated endpoint=weight request mix (endpoints: ' + ', '.join(ENDPOINTS) + ')')
+    parser.add_argument('--skew', type=float, default=1.0,
+                        help='Zipf exponent of requested locations (0 picks them uniformly)')
+    parser.add_argument('--miss-ratio', type=float, default=0.1,
+                        help='Share of requests for codes the API should not find')
+    parser.add_argument('--trashed-share', type=float, default=0.5,
+                        help='Share of the misses that ask for trashed codes rather than never-seeded ones')
+    parser.add_argument('--concurrency', type=int, default=16, help='Requests in flight at once (one connection each)')
+    parser.add_argument('--requests', type=int, default=10000, help='Requests to issue (0 for no limit)')
+    parser.add_argument('--duration', type=float, default=0, help='Seconds to run (default: until --requests)')
+    parser.add_argument('--hour', type=int, help='X-Current-Hour sent to the hourly endpoint (default: now)')
+    parser.add_argument('--stub', action='store_true', help='Serve a stub backend at --url instead of a real one')
+    parser.add_argument('--stub-latency', type=float, default=0, help='Milliseconds the stub waits per request')
+    parser.add_argument('--output', help="JSON results file ('-' for stdout)")
+
+    args = parser.parse_args()
+
+    if not args.requests and not args.duration:
+        parser.error("--requests 0 needs a --duration")
+
+    catalogue = seeder.CityCatalogue(args.city_count, seed=args.seed, country_skew=args.country_skew,
+                                     region_skew=args.region_skew, climate_bias=args.climate_bias)
+    try:
+        stats, wall_seconds = asyncio.run(run(args, catalogue, args.mix))
+    except Exception as e:
+        print(f"Error: {e}")
+        return 1
+
+    results = report(stats, wall_seconds)
+    if args.output:
+        results.update(url=args.url, city_count=args.city_count, seed=args.seed, mix=args.mix, skew=args.skew,
+                       miss_ratio=args.miss_ratio, concurrency=args.concurrency)
+        if args.output == '-':
+            print(json.dumps(results, indent=2))
+        else:
+            with open(args.output, 'w') as output:
+                json.dump(results, output, indent=2)
+            print(f"\nWrote results to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    exit(main())
@@ -1,11 +1,30 @@
 import psycopg2
-import random
+from psycopg2.extras import execute_values
+import numpy as np
+import hashlib
+import gzip
+import json
+import mmap
+import os
+import shutil
+import multiprocessing
+import math
+import secrets
 import datetime
+import struct
 from tqdm import tqdm
-import csv
-import io
 import time
 import argparse
+import asyncio
+import collections
+import traceback
+from queue import Empty
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+try:
+    import asyncpg
+except ImportError:  # only needed for --async-load
+    asyncpg = None
 
 # Weather status options
 WEATHER_STATUSES = [
@@ -26,433 +45,2738 @@ CLIMATE_TYPES = {
     "Temperate": {"min_temp_range": (0, 15), "max_temp_range": (15, 25)}
 }
 
-def create_schema(conn):
-    """Create database schema if it doesn't exist"""
-    cursor = conn.cursor()
-    print("Creating schema if it doesn't exist...")
+# Climate ranges as arrays, indexed by CLIMATE_NAMES position
+CLIMATE_NAMES = list(CLIMATE_TYPES)
+CLIMATE_INDEX = {name: i for i, name in enumerate(CLIMATE_NAMES)}
+CLIMATE_BOUNDS = np.array(
+    [CLIMATE_TYPES[name]["min_temp_range"] + CLIMATE_TYPES[name]["max_temp_range"] for name in CLIMATE_NAMES]
+)
+
+# Bump whenever the generated rows or their content hashes change, so cached
+# datasets and checkpointed runs are not reused
+GENERATOR_VERSION = 3
+
+# Size of the chunks COPY pulls from a CopyStream
+COPY_CHUNK_SIZE = 64 * 1024
+
+# Target number of rows generated together as one vectorized chunk
+CHUNK_ROWS = 64 * 1024
+
+# Chunks each async sub-load has serializing in the executor ahead of its COPY
+ASYNC_PREFETCH = 2
+
+# Column order used for COPY into each table
+LOCATION_COLUMNS = ('code', 'city_name', 'region_name', 'country_name', 'country_code', 'enabled', 'trashed')
+REALTIME_COLUMNS = ('location_code', 'temperature', 'humidity', 'precipitation', 'wind_speed', 'status', 'last_updated')
+DAILY_COLUMNS = ('day_of_month', 'month', 'location_code', 'min_temp', 'max_temp', 'precipitation', 'status')
+HOURLY_COLUMNS = ('hour_of_day', 'location_code', 'temperature', 'precipitation', 'status')
+COPY_COLUMNS = {
+    'locations': LOCATION_COLUMNS,
+    'realtime_weather': REALTIME_COLUMNS,
+    'weather_daily': DAILY_COLUMNS,
+    'weather_hourly': HOURLY_COLUMNS,
+}
 
-    # Create locations table
-    cursor.execute("""
-    CREATE TABLE IF NOT EXISTS locations (
-        code VARCHAR(12) PRIMARY KEY,
+# Rows per INSERT statement when a failed COPY falls back to batched inserts,
+# and how many rejected rows are listed in the report
+FALLBACK_PAGE_SIZE = 5000
+FALLBACK_REPORT_ROWS = 10
+# Bisection depth after which a failing slice is rejected whole; enough to
+# reach single rows within a CHUNK_ROWS chunk
+FALLBACK_MAX_DEPTH = 16
+
+# maintenance_work_mem for the index and constraint builds after a bulk load
+BULK_MAINTENANCE_WORK_MEM = '256MB'
+
+# Column definitions of each table, in load order
+TABLE_COLUMNS = {
+    'locations': """
+        code VARCHAR(12) NOT NULL,
         city_name VARCHAR(128) NOT NULL,
         region_name VARCHAR(128) NOT NULL,
         country_name VARCHAR(64) NOT NULL,
         country_code VARCHAR(2) NOT NULL,
         enabled BOOLEAN NOT NULL,
-        trashed BOOLEAN NOT NULL
-    )
-    """)
-
-    # Create realtime_weather table
-    cursor.execute("""
-    CREATE TABLE IF NOT EXISTS realtime_weather (
-        location_code VARCHAR(12) PRIMARY KEY REFERENCES locations(code),
+        trashed BOOLEAN NOT NULL""",
+    'realtime_weather': """
+        location_code VARCHAR(12) NOT NULL,
         temperature INTEGER NOT NULL,
         humidity INTEGER NOT NULL,
         precipitation INTEGER NOT NULL,
         wind_speed INTEGER NOT NULL,
         status VARCHAR(50) NOT NULL,
-        last_updated TIMESTAMP NOT NULL
-    )
-    """)
-
-    # Create weather_daily table
-    cursor.execute("""
-    CREATE TABLE IF NOT EXISTS weather_daily (
+        last_updated TIMESTAMP NOT NULL""",
+    'weather_daily': """
         day_of_month INTEGER NOT NULL,
         month INTEGER NOT NULL,
-        location_code VARCHAR(12) NOT NULL REFERENCES locations(code),
+        location_code VARCHAR(12) NOT NULL,
         min_temp INTEGER NOT NULL,
         max_temp INTEGER NOT NULL,
         precipitation INTEGER NOT NULL,
-        status VARCHAR(50) NOT NULL,
-        PRIMARY KEY (day_of_month, month, location_code)
-    )
-    """)
-
-    # Create weather_hourly table
-    cursor.execute("""
-    CREATE TABLE IF NOT EXISTS weather_hourly (
+        status VARCHAR(50) NOT NULL""",
+    'weather_hourly': """
         hour_of_day INTEGER NOT NULL,
-        location_code VARCHAR(12) NOT NULL REFERENCES locations(code),
+        location_code VARCHAR(12) NOT NULL,
         temperature INTEGER NOT NULL,
         precipitation INTEGER NOT NULL,
-        status VARCHAR(50) NOT NULL,
-        PRIMARY KEY (hour_of_day, location_code)
-    )
-    """)
+        status VARCHAR(50) NOT NULL""",
+}
 
-    # Create indexes for performance
-    # cursor.execute("CREATE INDEX IF NOT EXISTS idx_location_city ON locations(city_name)")
-    # cursor.execute("CREATE INDEX IF NOT EXISTS idx_location_country ON locations(country_name)")
-    # cursor.execute("CREATE INDEX IF NOT EXISTS idx_location_region ON locations(region_name)")
-    # cursor.execute("CREATE INDEX IF NOT EXISTS idx_daily_weather_month ON weather_daily(month)")
-    # cursor.execute("CREATE INDEX IF NOT EXISTS idx_realtime_temp ON realtime_weather(temperature)")
-    # cursor.execute("CREATE INDEX IF NOT EXISTS idx_hourly_temp ON weather_hourly(temperature)")
+TABLE_PRIMARY_KEYS = {
+    'locations': "PRIMARY KEY (code)",
+    'realtime_weather': "PRIMARY KEY (location_code)",
+    'weather_daily': "PRIMARY KEY (day_of_month, month, location_code)",
+    'weather_hourly': "PRIMARY KEY (hour_of_day, location_code)",
+}
+
+FOREIGN_KEY_TABLES = ['realtime_weather', 'weather_daily', 'weather_hourly']
+
+# Bookkeeping of checkpointed runs: one row per run, one per loaded (table, city range)
+SEED_PROGRESS_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS seed_runs (
+        run_id VARCHAR(16) PRIMARY KEY,
+        seed BIGINT NOT NULL,
+        city_count INTEGER NOT NULL,
+        months INTEGER NOT NULL,
+        country_skew DOUBLE PRECISION NOT NULL,
+        region_skew DOUBLE PRECISION NOT NULL,
+        climate_bias DOUBLE PRECISION NOT NULL,
+        as_of TIMESTAMP NOT NULL,
+        checkpoint_cities INTEGER NOT NULL,
+        started_at TIMESTAMP NOT NULL DEFAULT now()
+    )""",
+    """
+    CREATE TABLE IF NOT EXISTS seed_progress (
+        run_id VARCHAR(16) NOT NULL REFERENCES seed_runs (run_id),
+        table_name VARCHAR(32) NOT NULL,
+        first_city INTEGER NOT NULL,
+        stop_city INTEGER NOT NULL,
+        row_count INTEGER NOT NULL,
+        content_hash VARCHAR(16) NOT NULL,
+        finished_at TIMESTAMP NOT NULL DEFAULT now(),
+        PRIMARY KEY (run_id, table_name, first_city)
+    )""",
+]
+
+# Append-only archive of hourly observations written by --history-years
+HISTORY_COLUMNS = ('observed_at', 'location_code', 'temperature', 'precipitation', 'status')
+HISTORY_TABLE = """
+    CREATE TABLE IF NOT EXISTS weather_history (
+        observed_at TIMESTAMP NOT NULL,
+        location_code VARCHAR(12) NOT NULL,
+        temperature INTEGER NOT NULL,
+        precipitation INTEGER NOT NULL,
+        status VARCHAR(50) NOT NULL
+    )"""
+# Rows arrive in time order, so a BRIN index stays tiny and prunes by time range
+HISTORY_INDEX = ("CREATE INDEX IF NOT EXISTS idx_weather_history_observed_at "
+                 "ON weather_history USING brin (observed_at) WITH (pages_per_range = 32)")
+
+# Indexes behind the Spring repositories' queries, built after a bulk load
+SECONDARY_INDEXES = [
+    # LocationRepository.findAllUntrashedLocations
+    "CREATE INDEX IF NOT EXISTS idx_locations_trashed ON locations (trashed)",
+    # LocationRepository.findByCountryCodeAndCityName, RealtimeWeatherRepository.findByCountryCodeAndCity
+    "CREATE INDEX IF NOT EXISTS idx_locations_country_city ON locations (country_code, city_name)",
+    # DailyWeatherRepository.findByLocationCode
+    "CREATE INDEX IF NOT EXISTS idx_weather_daily_location ON weather_daily (location_code, month, day_of_month)",
+    # HourlyWeatherRepository.findByLocationCodeAndHour
+    "CREATE INDEX IF NOT EXISTS idx_weather_hourly_location ON weather_hourly (location_code, hour_of_day)",
+]
+
+def partition_layout(scheme, hash_partitions=8):
+    """Partitioned forecast tables of a scheme: {table: (PARTITION BY clause, [(partition, bound, key)])}
+
+    The key routes rows to the partition: its hash remainder, or its month.
+    """
+    if scheme == 'hash':
+        return {
+            table: ("HASH (location_code)", [
+                (f"{table}_p{i}", f"FOR VALUES WITH (MODULUS {hash_partitions}, REMAINDER {i})", i)
+                for i in range(hash_partitions)
+            ])
+            for table in ('weather_daily', 'weather_hourly')
+        }
+    if scheme == 'month':
+        return {'weather_daily': ("LIST (month)", [
+            (f"weather_daily_m{month:02d}", f"FOR VALUES IN ({month})", month) for month in range(1, 13)
+        ])}
+    return {}
+
+def foreign_key_clause():
+    return "FOREIGN KEY (location_code) REFERENCES locations(code)"
+
+def create_schema(conn, layout=None):
+    """Create database schema if it doesn't exist, partitioning the tables in layout"""
+    cursor = conn.cursor()
+    print("Creating schema if it doesn't exist...")
+
+    layout = layout or {}
+    for table, columns in TABLE_COLUMNS.items():
+        constraints = [TABLE_PRIMARY_KEYS[table]]
+        if table in FOREIGN_KEY_TABLES:
+            constraints.append(foreign_key_clause())
+
+        partition_by, partitions = layout.get(table, (None, []))
+        cursor.execute(f"CREATE TABLE IF NOT EXISTS {table} ({columns},\n        {', '.join(constraints)}\n    )"
+                       + (f" PARTITION BY {partition_by}" if partition_by else ""))
+        for partition, bound, _ in partitions:
+            cursor.execute(f"CREATE TABLE IF NOT EXISTS {partition} PARTITION OF {table} {bound}")
+
+    # Secondary indexes are only built by --bulk-load, see SECONDARY_INDEXES
 
     conn.commit()
     cursor.close()
     print("Schema created successfully!")
 
-def load_cities_data():
-    """Return a list of city data"""
-    # This is an embedded minimal dataset of 1000 cities
-    # Format: [code, city_name, region_name, country_name, country_code, climate_type]
-    cities_data = []
-
-    # World cities data with climate types assigned
-    # Only showing a few examples here - in the full script there would be 1000+ cities
-    sample_cities = [
-        ["NYC", "New York", "New York", "United States", "US", "Continental"],
-        ["LON", "London", "England", "United Kingdom", "GB", "Temperate"],
-        ["PAR", "Paris", "Île-de-France", "France", "FR", "Temperate"],
-        ["TYO", "Tokyo", "Kanto", "Japan", "JP", "Temperate"],
-        ["SYD", "Sydney", "New South Wales", "Australia", "AU", "Mediterranean"],
-        ["CAI", "Cairo", "Cairo Governorate", "Egypt", "EG", "Desert"],
-        ["RIO", "Rio de Janeiro", "Rio de Janeiro", "Brazil", "BR", "Tropical"],
-        ["BJS", "Beijing", "Beijing", "China", "CN", "Continental"],
-        ["MOS", "Moscow", "Moscow Oblast", "Russia", "RU", "Continental"],
-        ["CPT", "Cape Town", "Western Cape", "South Africa", "ZA", "Mediterranean"],
+def create_bulk_schema(conn, layout=None):
+    """Create the tables UNLOGGED and without constraints, ready for COPY FREEZE.
+
+    A partitioned table cannot be unlogged itself, so only its partitions are.
+    """
+    cursor = conn.cursor()
+    print("Creating unlogged tables without constraints for bulk load...")
+
+    layout = layout or {}
+    cursor.execute("DROP TABLE IF EXISTS weather_hourly, weather_daily, realtime_weather, locations CASCADE")
+    for table, columns in TABLE_COLUMNS.items():
+        if table in layout:
+            partition_by, partitions = layout[table]
+            cursor.execute(f"CREATE TABLE {table} ({columns}\n    ) PARTITION BY {partition_by}")
+            for partition, bound, _ in partitions:
+                cursor.execute(f"CREATE UNLOGGED TABLE {partition} PARTITION OF {table} {bound}")
+        else:
+            cursor.execute(f"CREATE UNLOGGED TABLE {table} ({columns}\n    )")
+
+    conn.commit()
+    cursor.close()
+
+def run_parallel(db_params, statements):
+    """Run each statement on its own autocommit connection, all at once"""
+    def run(statement):
+        conn = connect(db_params)
+        conn.autocommit = True
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"SET maintenance_work_mem = '{BULK_MAINTENANCE_WORK_MEM}'")
+            cursor.execute(statement)
+        finally:
+            conn.close()
+
+    with ThreadPoolExecutor(max_workers=len(statements)) as pool:
+        list(pool.map(run, statements))
+
+def finish_bulk_load(db_params, layout=None):
+    """Add keys, switch to LOGGED, build secondary indexes and ANALYZE, timing each phase"""
+    layout = layout or {}
+    flat_tables = [table for table in FOREIGN_KEY_TABLES if table not in layout]
+    unlogged_tables = [partition for table in FOREIGN_KEY_TABLES
+                       for partition in ([name for name, _, _ in layout[table][1]] if table in layout else [table])]
+
+    # (phase, statements, whether the statements may run concurrently)
+    phases = [
+        # Primary keys lock only their own table, so all four build at once
+        ("primary keys", [f"ALTER TABLE {table} ADD {key}" for table, key in TABLE_PRIMARY_KEYS.items()], True),
+        # Adding a foreign key locks locations too, but NOT VALID makes it instant
+        ("foreign keys", [f"ALTER TABLE {table} ADD {foreign_key_clause()} NOT VALID" for table in flat_tables],
+         False),
+        # Validation takes weaker locks, so the scans run in parallel
+        ("foreign key validation", [
+            f"ALTER TABLE {table} VALIDATE CONSTRAINT {table}_location_code_fkey" for table in flat_tables
+        ], True),
+        # A logged table may not reference an unlogged one, so locations goes first
+        ("logged locations", ["ALTER TABLE locations SET LOGGED"], False),
+        ("logged weather tables", [f"ALTER TABLE {table} SET LOGGED" for table in unlogged_tables], True),
+        # A partitioned table is never unlogged, so its key waits for a logged locations;
+        # NOT VALID isn't supported there, so it is checked as it is added
+        ("partitioned foreign keys", [f"ALTER TABLE {table} ADD {foreign_key_clause()}" for table in layout], False),
+        ("secondary indexes", SECONDARY_INDEXES, True),
+        ("analyze", [f"ANALYZE {table}" for table in TABLE_COLUMNS], True),
     ]
 
-    # In a real script, you would load hundreds or thousands of cities
-    # This is just a small sample to demonstrate the pattern
+    print("\n----- Bulk Load Phases -----")
+    for name, statements, parallel in phases:
+        if not statements:
+            continue
+        start_time = time.time()
+        if parallel:
+            run_parallel(db_params, statements)
+        else:
+            for statement in statements:
+                run_parallel(db_params, [statement])
+        print(f"{name}: {time.time() - start_time:.2f} seconds")
+
+# Real cities placed at the start of every catalogue
+# Format: [code, city_name, region_name, country_name, country_code, climate_type]
+SAMPLE_CITIES = [
+    ["NYC", "New York", "New York", "United States", "US", "Continental"],
+    ["LON", "London", "England", "United Kingdom", "GB", "Temperate"],
+    ["PAR", "Paris", "Île-de-France", "France", "FR", "Temperate"],
+    ["TYO", "Tokyo", "Kanto", "Japan", "JP", "Temperate"],
+    ["SYD", "Sydney", "New South Wales", "Australia", "AU", "Mediterranean"],
+    ["CAI", "Cairo", "Cairo Governorate", "Egypt", "EG", "Desert"],
+    ["RIO", "Rio de Janeiro", "Rio de Janeiro", "Brazil", "BR", "Tropical"],
+    ["BJS", "Beijing", "Beijing", "China", "CN", "Continental"],
+    ["MOS", "Moscow", "Moscow Oblast", "Russia", "RU", "Continental"],
+    ["CPT", "Cape Town", "Western Cape", "South Africa", "ZA", "Mediterranean"],
+]
+
+# Countries for synthetic cities, most populous first so Zipf ranks follow size.
+# The first climate is the country's prevailing one.
+COUNTRIES = [
+    ("India", "IN", ["Tropical", "Desert", "Temperate"]),
+    ("China", "CN", ["Continental", "Temperate", "Desert"]),
+    ("United States", "US", ["Continental", "Temperate", "Desert", "Mediterranean"]),
+    ("Indonesia", "ID", ["Tropical"]),
+    ("Pakistan", "PK", ["Desert", "Continental"]),
+    ("Nigeria", "NG", ["Tropical", "Desert"]),
+    ("Brazil", "BR", ["Tropical", "Temperate"]),
+    ("Bangladesh", "BD", ["Tropical"]),
+    ("Russia", "RU", ["Continental", "Polar"]),
+    ("Ethiopia", "ET", ["Tropical", "Desert"]),
+    ("Mexico", "MX", ["Desert", "Tropical", "Temperate"]),
+    ("Japan", "JP", ["Temperate", "Continental"]),
+    ("Egypt", "EG", ["Desert", "Mediterranean"]),
+    ("Philippines", "PH", ["Tropical"]),
+    ("Vietnam", "VN", ["Tropical"]),
+    ("Iran", "IR", ["Desert", "Continental"]),
+    ("Turkey", "TR", ["Mediterranean", "Continental"]),
+    ("Germany", "DE", ["Temperate", "Continental"]),
+    ("Thailand", "TH", ["Tropical"]),
+    ("United Kingdom", "GB", ["Temperate"]),
+    ("France", "FR", ["Temperate", "Mediterranean"]),
+    ("South Africa", "ZA", ["Mediterranean", "Desert", "Temperate"]),
+    ("Italy", "IT", ["Mediterranean", "Temperate"]),
+    ("Kenya", "KE", ["Tropical", "Desert"]),
+    ("Colombia", "CO", ["Tropical"]),
+    ("South Korea", "KR", ["Continental", "Temperate"]),
+    ("Spain", "ES", ["Mediterranean", "Desert"]),
+    ("Argentina", "AR", ["Temperate", "Desert", "Polar"]),
+    ("Algeria", "DZ", ["Desert", "Mediterranean"]),
+    ("Canada", "CA", ["Continental", "Polar", "Temperate"]),
+    ("Poland", "PL", ["Continental", "Temperate"]),
+    ("Morocco", "MA", ["Mediterranean", "Desert"]),
+    ("Saudi Arabia", "SA", ["Desert"]),
+    ("Peru", "PE", ["Desert", "Tropical"]),
+    ("Australia", "AU", ["Desert", "Mediterranean", "Tropical", "Temperate"]),
+    ("Chile", "CL", ["Mediterranean", "Desert", "Polar"]),
+    ("Netherlands", "NL", ["Temperate"]),
+    ("Sweden", "SE", ["Continental", "Polar"]),
+    ("Norway", "NO", ["Polar", "Temperate"]),
+    ("Iceland", "IS", ["Polar"]),
+]
 
-    # Generate codes for a large number of additional cities
-    for i in range(1, 2000):
-        code = f"CT{i:04d}"
-        city_name = f"City {i}"
-        region_name = f"Region {random.randint(1, 100)}"
-        country_name = f"Country {random.randint(1, 50)}"
-        country_code = country_name[:2].upper()
-        climate_type = random.choice(list(CLIMATE_TYPES.keys()))
+# Climate indices per country, padded with the prevailing climate
+COUNTRY_CLIMATE_COUNTS = np.array([len(climates) for _, _, climates in COUNTRIES])
+COUNTRY_CLIMATES = np.array([
+    [CLIMATE_INDEX[name] for name in climates + climates[:1] * (COUNTRY_CLIMATE_COUNTS.max() - len(climates))]
+    for _, _, climates in COUNTRIES
+])
+
+CODE_ALPHABET = np.frombuffer(b'0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ', dtype=np.uint8)
+CODE_DIGITS = 6
+
+# Synthetic codes are 'CT' plus 6 base-36 digits, well inside VARCHAR(12)
+MAX_CITY_COUNT = len(SAMPLE_CITIES) + len(CODE_ALPHABET) ** CODE_DIGITS - 1
+
+def _splitmix64(x):
+    """SplitMix64 finalizer over a uint64 array: a cheap, well-mixed 64-bit hash"""
+    x = x + np.uint64(0x9E3779B97F4A7C15)  # a fresh array, so the rest can work in place
+    x ^= x >> np.uint64(30)
+    x *= np.uint64(0xBF58476D1CE4E5B9)
+    x ^= x >> np.uint64(27)
+    x *= np.uint64(0x94D049BB133111EB)
+    x ^= x >> np.uint64(31)
+    return x
+
+def stable_key(*parts):
+    """64-bit key derived from any printable parts, identical across runs and processes"""
+    digest = hashlib.blake2b('\0'.join(map(str, parts)).encode('utf-8'), digest_size=8).digest()
+    return np.uint64(int.from_bytes(digest, 'little'))
+
+def hash_uniform(key, counters):
+    """Uniform floats in [0, 1), a pure function of key and each counter"""
+    bits = _splitmix64(_splitmix64(counters.astype(np.uint64, copy=False)) ^ key)
+    return (bits >> np.uint64(11)).astype(np.float64) * (1.0 / (1 << 53))
+
+# Keys the content hashes of each column kind's values start from
+VALUE_KEYS = {kind: stable_key('value', kind) for kind in ('int4', 'bool', 'text', 'timestamp')}
+
+def value_hashes(kind, values):
+    """Stable 64-bit hash of each of a list of column values, computed array-wide.
+
+    Integers, booleans and timestamps (as microseconds) hash as one 64-bit
+    word; strings fold in their UTF-8 bytes eight at a time, seeded with
+    their length, the way city_keys reads location codes. A string only
+    takes in the words it fills, so its hash never depends on the longest
+    string it is hashed alongside.
+    """
+    key = VALUE_KEYS[kind]
+    if not len(values):
+        return np.zeros(0, dtype=np.uint64)
+    if kind == 'text':
+        data = _encode_all(values)
+        lengths = np.fromiter(map(len, data), dtype=np.uint64, count=len(data))
+        width = 8 * max(1, -(-int(lengths.max()) // 8))
+        hashes = _splitmix64(lengths ^ key)
+        words = np.array(data, dtype=f'S{width}').view('<u8').reshape(len(data), -1)
+        for i, word in enumerate(words.T):
+            hashes = np.where(lengths > np.uint64(8 * i), _splitmix64(hashes ^ word), hashes)
+        return hashes
+    if kind == 'timestamp':
+        values = [(value - PG_EPOCH) // datetime.timedelta(microseconds=1) for value in values]
+    return _splitmix64(np.asarray(values, dtype=np.int64).view(np.uint64) ^ key)
+
+def zipf_cdf(count, skew):
+    """Cumulative Zipf weights over ranks 1..count (skew 0 is uniform)"""
+    weights = 1.0 / np.arange(1, count + 1) ** skew
+    return np.cumsum(weights) / weights.sum()
+
+class CityBlock:
+    """Attributes of a contiguous range of catalogue cities"""
+
+    def __init__(self, codes, city_names, region_names, country_names, country_codes, climates):
+        self.codes = codes
+        self.city_names = city_names
+        self.region_names = region_names
+        self.country_names = country_names
+        self.country_codes = country_codes
+        self.climates = climates
+
+    def __len__(self):
+        return len(self.codes)
+
+class CityCatalogue:
+    """A deterministic, lazily generated set of cities.
+
+    City i is a pure function of (seed, i), so any range can be generated
+    on its own, in any process, without holding the others in memory.
+    Countries and regions are Zipf-distributed; each city takes its
+    country's prevailing climate with probability climate_bias.
+    """
+
+    def __init__(self, count, seed=0, country_skew=1.0, region_skew=0.8, regions_per_country=100,
+                 climate_bias=0.7, start=0, stop=None):
+        if count > MAX_CITY_COUNT:
+            raise ValueError(f"city count {count} exceeds the {MAX_CITY_COUNT} available codes")
+
+        self.count = count
+        self.seed = seed
+        self.country_skew = country_skew
+        self.region_skew = region_skew
+        self.regions_per_country = regions_per_country
+        self.climate_bias = climate_bias
+        self.start = start
+        self.stop = count if stop is None else stop
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def subset(self, start, stop):
+        """The cities with catalogue indices start..stop-1"""
+        return CityCatalogue(self.count, self.seed, self.country_skew, self.region_skew,
+                             self.regions_per_country, self.climate_bias, start, stop)
+
+    def split(self, parts):
+        """Split into at most `parts` contiguous, non-empty ranges"""
+        size = max(1, -(-len(self) // parts))
+        return [self.subset(start, min(start + size, self.stop)) for start in range(self.start, self.stop, size)]
+
+    def blocks(self, rows_per_city=1):
+        """Yield CityBlocks of about CHUNK_ROWS generated rows each"""
+        size = max(1, CHUNK_ROWS // rows_per_city)
+        for start in range(self.start, self.stop, size):
+            yield self.block(start, min(start + size, self.stop))
+
+    def block(self, start, stop):
+        """Generate the cities with catalogue indices start..stop-1"""
+        return self.select(np.arange(start, stop))
+
+    def select(self, index):
+        """Generate the cities at any catalogue indices, in the order given"""
+        index = np.asarray(index, dtype=np.int64)
+        *columns, climates = self._synthetic(np.maximum(index, len(SAMPLE_CITIES)))
+
+        for position in np.flatnonzero(index < len(SAMPLE_CITIES)).tolist():
+            sample = SAMPLE_CITIES[index[position]]
+            for column, value in zip(columns, sample):
+                column[position] = value
+            climates[position] = CLIMATE_INDEX[sample[5]]
+
+        return CityBlock(*columns, climates)
+
+    def _synthetic(self, index):
+        """Vectorized attributes of the synthetic cities at the given catalogue indices"""
+        country = np.searchsorted(zipf_cdf(len(COUNTRIES), self.country_skew),
+                                  hash_uniform(stable_key(self.seed, 'city', 'country'), index))
+        region = 1 + np.searchsorted(zipf_cdf(self.regions_per_country, self.region_skew),
+                                     hash_uniform(stable_key(self.seed, 'city', 'region'), index))
+
+        # Prevailing climate, or any of the country's climates
+        prevailing = hash_uniform(stable_key(self.seed, 'city', 'prevailing'), index) < self.climate_bias
+        pick = hash_uniform(stable_key(self.seed, 'city', 'climate'), index)
+        alternative = COUNTRY_CLIMATES[country, (pick * COUNTRY_CLIMATE_COUNTS[country]).astype(np.int64)]
+        climates = np.where(prevailing, COUNTRY_CLIMATES[country, 0], alternative)
+
+        # Synthetic cities are numbered from 1, as fixed-width base-36 digits after 'CT'
+        serial = (index - len(SAMPLE_CITIES) + 1).astype(np.int64)
+        digits = np.empty((len(index), 2 + CODE_DIGITS), dtype=np.uint8)
+        digits[:, 0], digits[:, 1] = ord('C'), ord('T')
+        for position in range(CODE_DIGITS):
+            digits[:, 2 + CODE_DIGITS - 1 - position] = CODE_ALPHABET[(serial // 36 ** position) % 36]
+        codes = digits.view(f'S{2 + CODE_DIGITS}').ravel().astype(str).tolist()
+
+        country = country.tolist()
+        return (
+            codes,
+            [f"City {i}" for i in serial.tolist()],
+            [f"Region {r}" for r in region.tolist()],
+            [COUNTRIES[c][0] for c in country],
+            [COUNTRIES[c][1] for c in country],
+            climates,
+        )
 
-        cities_data.append([code, city_name, region_name, country_name, country_code, climate_type])
+class CitySelection(CityCatalogue):
+    """The cities of a catalogue at arbitrary indices, e.g. those routed to one partition.
+
+    Positions 0..len-1 take the place of catalogue indices in subset and
+    split, so the chunk generators work on a selection unchanged.
+    """
+
+    def __init__(self, catalogue, index):
+        super().__init__(catalogue.count, catalogue.seed, catalogue.country_skew, catalogue.region_skew,
+                         catalogue.regions_per_country, catalogue.climate_bias, 0, len(index))
+        self.catalogue = catalogue
+        self.index = np.asarray(index, dtype=np.int64)
+
+    def subset(self, start, stop):
+        return CitySelection(self.catalogue, self.index[start:stop])
+
+    def block(self, start, stop):
+        return self.select(self.index[start:stop])
+
+class TokenColumn:
+    """A generated column stored as indices into a small vocabulary.
+
+    Weather columns only take a few dozen distinct values per chunk, so each
+    value is formatted once and rows are assembled by gathering bytes out of
+    the vocabulary instead of formatting every field in Python.
+    """
+
+    def __init__(self, kind, values, indices):
+        self.kind = kind
+        self.values = values
+        self.indices = indices
+
+    @classmethod
+    def integers(cls, array):
+        """Column of integers, vocabulary spanning the chunk's min..max"""
+        low, high = int(array.min()), int(array.max())
+        return cls('int4', list(range(low, high + 1)), array - low)
+
+    @classmethod
+    def booleans(cls, array):
+        return cls('bool', [False, True], array.astype(np.int64))
+
+    @classmethod
+    def strings(cls, values, indices):
+        return cls('text', values, indices)
+
+    @classmethod
+    def timestamps(cls, values, indices):
+        return cls('timestamp', values, indices)
+
+    def __len__(self):
+        return len(self.indices)
+
+    def tokens(self, copy_format):
+        """Encoded vocabulary for COPY in the given format"""
+        return TOKEN_ENCODERS[copy_format][self.kind](self.values)
+
+    def value_hashes(self):
+        """Stable 64-bit hash of each row's value, independent of COPY format"""
+        return value_hashes(self.kind, self.values)[self.indices]
+
+    def tolist(self):
+        values = self.values
+        return [values[i] for i in self.indices.tolist()]
+
+def escape_copy_text(value):
+    """Escape the characters COPY text format treats specially"""
+    return (value.replace('\\', '\\\\').replace('\t', '\\t')
+            .replace('\n', '\\n').replace('\r', '\\r'))
+
+def quote_csv(value):
+    """Quote a CSV field when needed; empty strings too, since unquoted they read as NULL"""
+    if value and not any(c in value for c in ',"\n\r\\'):
+        return value
+    return '"' + value.replace('"', '""') + '"'
+
+def _encode_all(texts):
+    """Encode a list of strings in one call; NUL never occurs in Postgres text"""
+    return '\0'.join(texts).encode('utf-8').split(b'\0')
+
+def _binary_text(values):
+    return [struct.pack('>i', len(token)) + token for token in _encode_all(values)]
+
+def _binary_timestamp(values):
+    return [struct.pack('>iq', 8, (value - PG_EPOCH) // datetime.timedelta(microseconds=1)) for value in values]
+
+# How each column kind is written in COPY text, CSV and binary (PGCOPY) format
+TOKEN_ENCODERS = {
+    'text': {
+        'int4': lambda values: _encode_all(map(str, values)),
+        'bool': lambda values: [b't' if value else b'f' for value in values],
+        'text': lambda values: _encode_all(escape_copy_text('\0'.join(values)).split('\0')),
+        'timestamp': lambda values: _encode_all(value.isoformat(' ') for value in values),
+    },
+    'csv': {
+        'int4': lambda values: _encode_all(map(str, values)),
+        'bool': lambda values: [b't' if value else b'f' for value in values],
+        'text': lambda values: _encode_all(map(quote_csv, values)),
+        'timestamp': lambda values: _encode_all(value.isoformat(' ') for value in values),
+    },
+    'binary': {
+        'int4': lambda values: [struct.pack('>ii', 4, value) for value in values],
+        'bool': lambda values: [struct.pack('>i?', 1, value) for value in values],
+        'text': _binary_text,
+        'timestamp': _binary_timestamp,
+    },
+}
 
-    # Add the sample real cities at the beginning
-    cities_data = sample_cities + cities_data
+PG_EPOCH = datetime.datetime(2000, 1, 1)
+PGCOPY_HEADER = b'PGCOPY\n\xff\r\n\0' + struct.pack('>ii', 0, 0)
+PGCOPY_TRAILER = struct.pack('>h', -1)
+
+def _token_table(tokens, suffix):
+    """Pad tokens (each followed by suffix) with NULs to a fixed-width byte table plus a mask of the real bytes"""
+    lengths = np.fromiter(map(len, tokens), dtype=np.int64, count=len(tokens)) + len(suffix)
+    mask = np.arange(lengths.max()) < lengths[:, None]
+    table = np.zeros(mask.shape, dtype=np.uint8)
+    table[mask] = np.frombuffer(suffix.join(tokens) + suffix, dtype=np.uint8)
+    return table, mask
+
+def _assemble_rows(fields, row_count, nul_free=False):
+    """Concatenate (tokens, suffix, indices) fields row by row into one bytes payload.
+
+    Each field is gathered into a fixed-width slot of a row matrix, then the
+    padding is squeezed out in one pass over the whole chunk. When no token
+    can contain a NUL byte (nul_free, as in COPY text and CSV) that pass just
+    deletes the NULs; otherwise a mask of the real bytes is gathered
+    alongside and compressed with.
+    """
+    tables = [_token_table(tokens, suffix) for tokens, suffix, _ in fields]
+
+    # One fixed-width void field per column, so each gather is a row of memcpys
+    layout = np.dtype([(f'f{i}', f'V{table.shape[1]}') for i, (table, _) in enumerate(tables)])
+    rows = np.empty(row_count, dtype=layout)
+    keep = None if nul_free else np.empty(row_count, dtype=layout)
+
+    for i, ((_, _, indices), (table, mask)) in enumerate(zip(fields, tables)):
+        void = f'V{table.shape[1]}'
+        rows[f'f{i}'] = table.view(void).ravel()[indices]
+        if keep is not None:
+            keep[f'f{i}'] = mask.view(np.uint8).view(void).ravel()[indices]
+
+    if keep is None:
+        return rows.tobytes().translate(None, b'\0')
+    return np.compress(keep.view(bool), rows.view(np.uint8)).tobytes()
+
+def encode_copy_text(columns, copy_format='text'):
+    """Serialize a list of TokenColumns into COPY text or CSV format"""
+    last = len(columns) - 1
+    separator = b',' if copy_format == 'csv' else b'\t'
+    # Postgres text values cannot hold NUL, so no token does
+    return _assemble_rows(
+        [(column.tokens(copy_format), b'\n' if i == last else separator, column.indices)
+         for i, column in enumerate(columns)],
+        len(columns[0]), nul_free=True
+    )
 
-    return cities_data
+def encode_copy_binary(columns):
+    """Serialize a list of TokenColumns into COPY binary tuples (no header or trailer)"""
+    row_count = len(columns[0])
+    field_count = ([struct.pack('>h', len(columns))], b'', np.zeros(row_count, dtype=np.int64))
+    return _assemble_rows(
+        [field_count] + [(column.tokens('binary'), b'', column.indices) for column in columns],
+        row_count
+    )
 
-def insert_locations(conn, cities_data):
-    """Insert locations data"""
-    cursor = conn.cursor()
+class RowChunk:
+    """A block of generated rows for one table, held as columns"""
+
+    def __init__(self, table, columns):
+        self.table = table
+        self.columns = columns
+        self.row_count = len(columns[0])
+
+    def to_copy_text(self):
+        return encode_copy_text(self.columns)
+
+    def row_hashes(self):
+        """Stable 64-bit hash of each row's values"""
+        # Value hashes are already well mixed, so an odd multiply per column
+        # keeps their order and one finalizer at the end is enough
+        hashes = np.zeros(self.row_count, dtype=np.uint64)
+        for column in self.columns:
+            hashes ^= column.value_hashes()
+            hashes *= np.uint64(0x9E3779B97F4A7C15)
+        return _splitmix64(hashes)
+
+    def content_hash(self):
+        """Order-independent 64-bit hash of the rows' values (a sum of row hashes)"""
+        return int(self.row_hashes().sum(dtype=np.uint64))
+
+    def to_copy_binary(self):
+        return encode_copy_binary(self.columns)
+
+    def encode(self, copy_format):
+        if copy_format == 'binary':
+            return self.to_copy_binary()
+        return encode_copy_text(self.columns, copy_format)
+
+    def rows(self):
+        """Row tuples for the slow INSERT path"""
+        return zip(*(column.tolist() for column in self.columns))
+
+class EncodedChunk:
+    """A chunk already serialized for COPY, e.g. by a producer process"""
+
+    def __init__(self, payload, row_count, content_hash):
+        self.payload = payload
+        self.row_count = row_count
+        self.hash = content_hash
+
+    def encode(self, copy_format):
+        return self.payload
+
+    def content_hash(self):
+        return self.hash
+
+class CopyStream:
+    """File-like adapter that feeds COPY from a generator of RowChunks.
+
+    COPY pulls fixed-size chunks through read(), so rows are produced on
+    demand while earlier chunks are already on the wire, and only one chunk
+    is held in memory at a time.
+    """
+
+    def __init__(self, chunks, copy_format='text', chunk_size=COPY_CHUNK_SIZE):
+        self._chunks = iter(chunks)
+        # The payload being sent and how far into it COPY has read; slicing
+        # a memoryview copies nothing, so each byte is copied once, into read()'s result
+        self._payload = memoryview(PGCOPY_HEADER if copy_format == 'binary' else b'')
+        self._offset = 0
+        self._trailer = PGCOPY_TRAILER if copy_format == 'binary' else b''
+        self.copy_format = copy_format
+        self.chunk_size = chunk_size
+        self.row_count = 0
+        self.byte_count = 0
+        self.content_hash = 0
+
+    def _next_payload(self):
+        """Move on to the next chunk's payload, then the trailer; False once both are exhausted"""
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            if not self._trailer:
+                return False
+            payload, self._trailer = self._trailer, b''
+        else:
+            payload = chunk.encode(self.copy_format)
+            self.row_count += chunk.row_count
+            self.content_hash = (self.content_hash + chunk.content_hash()) % (1 << 64)
+        self._payload = memoryview(payload)
+        self._offset = 0
+        return True
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = self.chunk_size
+
+        pieces = []
+        length = 0
+        while length < size:
+            if self._offset == len(self._payload) and not self._next_payload():
+                break
+            piece = self._payload[self._offset:self._offset + size - length]
+            self._offset += len(piece)
+            length += len(piece)
+            pieces.append(piece)
+
+        self.byte_count += length
+        return b''.join(pieces)
+
+    def readline(self, size=-1):
+        return self.read(size)
+
+class CachedStream:
+    """File-like reader over a memory-mapped cached COPY payload"""
+
+    def __init__(self, path, meta):
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.row_count = meta['rows']
+        self.content_hash = int(meta['hash'], 16)
+        self.byte_count = 0
+
+    def read(self, size=-1):
+        data = self._map.read(size if size and size > 0 else COPY_CHUNK_SIZE)
+        self.byte_count += len(data)
+        return data
+
+    def readline(self, size=-1):
+        return self.read(size)
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+class CacheWriter:
+    """Passes a CopyStream through to COPY while writing the same bytes to a cache file"""
+
+    def __init__(self, stream, path):
+        self.stream = stream
+        self.path = path
+        self._file = open(path + '.tmp', 'wb')
+
+    def read(self, size=-1):
+        data = self.stream.read(size)
+        self._file.write(data)
+        return data
+
+    def readline(self, size=-1):
+        return self.read(size)
+
+    @property
+    def row_count(self):
+        return self.stream.row_count
+
+    @property
+    def byte_count(self):
+        return self.stream.byte_count
+
+    @property
+    def content_hash(self):
+        return self.stream.content_hash
+
+    def close(self, complete):
+        """Publish the file with its row count and hash, or drop it if COPY didn't finish"""
+        self._file.close()
+        if not complete:
+            os.remove(self.path + '.tmp')
+            return
+        with open(self.path + '.json', 'w') as meta_file:
+            json.dump(dict(rows=self.row_count, bytes=self.byte_count, hash=f"{self.content_hash:016x}"), meta_file)
+        os.replace(self.path + '.tmp', self.path)
+
+class DatasetCache:
+    """Serialized COPY payloads on disk, one directory per set of generation parameters.
+
+    Payloads are kept exactly as they were sent to COPY, one file per table
+    and city range, and are memory-mapped back on a repeat run so nothing
+    is generated again. Entries unused for max_age seconds, then the least
+    recently used beyond max_bytes, are evicted.
+    """
+
+    def __init__(self, root, key, max_bytes, max_age):
+        self.root = root
+        self.path = os.path.join(root, key)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        os.makedirs(self.path, exist_ok=True)
+        os.utime(self.path)  # last use, for eviction
+
+    def as_of(self, as_of):
+        """The entry's realtime reference time: the first run's, so cached payloads stay consistent"""
+        path = os.path.join(self.path, 'entry.json')
+        if os.path.exists(path):
+            with open(path) as entry_file:
+                return datetime.datetime.fromisoformat(json.load(entry_file)['as_of'])
+        with open(path, 'w') as entry_file:
+            json.dump(dict(as_of=as_of.isoformat(), generator_version=GENERATOR_VERSION), entry_file)
+        return as_of
+
+    def part_path(self, table, cities, copy_format):
+        return os.path.join(self.path, f"{table}-{cities[0]}-{cities[1]}.{copy_format}")
+
+    def open(self, table, cities, copy_format):
+        """A CachedStream of the part, or None on a miss"""
+        path = self.part_path(table, cities, copy_format)
+        if not os.path.exists(path):
+            return None
+        with open(path + '.json') as meta_file:
+            return CachedStream(path, json.load(meta_file))
+
+    def writer(self, stream, table, cities, copy_format):
+        return CacheWriter(stream, self.part_path(table, cities, copy_format))
+
+    def evict(self):
+        """Delete entries older than max_age, then the least recently used until under max_bytes"""
+        now = time.time()
+        entries = []
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if os.path.isdir(path):
+                size = sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+                entries.append((os.path.getmtime(path), size, path))
+
+        kept = 0
+        for used, size, path in sorted(entries, reverse=True):
+            if path != self.path and (now - used > self.max_age or kept + size > self.max_bytes):
+                print(f"Evicting cached dataset {os.path.basename(path)} ({size / 1e6:.1f} MB)")
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                kept += size
+
+# The --cache-dir cache, if any; worker processes inherit it
+DATASET_CACHE = None
+
+# Every COPY in this process: dicts of table, format, rows, bytes, seconds and content hash
+COPY_STATS = []
+
+# Length of COPY_STATS when each table was last truncated; earlier loads no longer count
+TRUNCATED_STATS = {}
+
+def copy_chunks(cursor, table, columns, chunks, copy_format='text', freeze=False, cities=None):
+    """Stream chunks into table with COPY and return the number of rows sent.
+
+    With freeze, the table must have been created or truncated in the
+    current transaction; rows are then written already frozen. With the
+    dataset cache on, `cities` (a start, stop range) names the cached part:
+    a hit streams it without touching chunks, a miss caches what is sent.
+    """
+    cache = DATASET_CACHE if cities else None
+    cached = cache.open(table, cities, copy_format) if cache else None
+    if cached:
+        print(f"Streaming {table} from the dataset cache...")
+        stream = cached
+    elif cache:
+        stream = cache.writer(CopyStream(chunks, copy_format), table, cities, copy_format)
+    else:
+        stream = CopyStream(chunks, copy_format)
+
+    start_time = time.time()
+    options = f"FORMAT {copy_format}, FREEZE" if freeze else f"FORMAT {copy_format}"
+    complete = False
+    try:
+        cursor.copy_expert(
+            f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH ({options})",
+            stream,
+            size=COPY_CHUNK_SIZE
+        )
+        complete = True
+    finally:
+        if cached:
+            cached.close()
+        elif cache:
+            stream.close(complete)
+
+    COPY_STATS.append(dict(
+        table=table, format=copy_format, rows=stream.row_count,
+        bytes=stream.byte_count, seconds=time.time() - start_time, hash=stream.content_hash,
+        **({} if cached else getattr(chunks, 'metrics', {}))
+    ))
+    return stream.row_count
+
+def print_copy_stats(stats, title='COPY Throughput'):
+    """Print COPY throughput per table, text and binary side by side"""
+    totals = {}
+    for stat in stats:
+        key = (stat['table'], stat['format'])
+        total = totals.setdefault(key, dict(rows=0, bytes=0, seconds=0.0, hash=0))
+        for field in ('rows', 'bytes', 'seconds'):
+            total[field] += stat[field]
+        total['hash'] = (total['hash'] + stat['hash']) % (1 << 64)
+
+    print(f"\n----- {title} -----")
+    print(f"{'table':<18}{'format':<8}{'rows':>12}{'MB':>10}{'seconds':>10}{'rows/sec':>14}{'MB/sec':>10}")
+    for (table, copy_format), total in sorted(totals.items()):
+        seconds = max(total['seconds'], 1e-9)
+        megabytes = total['bytes'] / 1e6
+        print(f"{table:<18}{copy_format:<8}{total['rows']:>12}{megabytes:>10.1f}{total['seconds']:>10.2f}"
+              f"{total['rows'] / seconds:>14,.0f}{megabytes / seconds:>10.1f}")
+
+    # Sums of row hashes, so they match however the rows were chunked or split across workers
+    print("\n----- Content Hashes -----")
+    for (table, copy_format), total in sorted(totals.items()):
+        print(f"{table:<18}{copy_format:<8}{total['rows']:>12}  {total['hash']:016x}")
+
+def print_pipeline_stats(stats):
+    """Print queue depth and stall times per table for pipelined COPYs"""
+    totals = {}
+    for stat in stats:
+        if 'producers' not in stat:
+            continue
+        total = totals.setdefault(stat['table'], dict(chunks=0, queue_depth_total=0, queue_depth_max=0,
+                                                      consumer_wait=0.0, producer_blocked=0.0,
+                                                      producers=stat['producers'], capacity=stat['queue_capacity']))
+        for field in ('chunks', 'queue_depth_total', 'consumer_wait', 'producer_blocked'):
+            total[field] += stat[field]
+        total['queue_depth_max'] = max(total['queue_depth_max'], stat['queue_depth_max'])
+
+    if not totals:
+        return
+
+    # Consumer waiting on an empty queue means generation can't keep up;
+    # producers blocked on a full one means COPY can't
+    print("\n----- Pipeline -----")
+    print(f"{'table':<18}{'producers':>10}{'chunks':>8}{'avg depth':>11}{'max depth':>11}"
+          f"{'COPY waited':>13}{'producers blocked':>19}  bottleneck")
+    for table, total in totals.items():
+        average = total['queue_depth_total'] / max(total['chunks'], 1)
+        bottleneck = 'client' if total['consumer_wait'] > total['producer_blocked'] else 'postgres'
+        print(f"{table:<18}{total['producers']:>10}{total['chunks']:>8}{average:>11.1f}"
+              f"{total['queue_depth_max']:>7}/{total['capacity']:<3}{total['consumer_wait']:>12.2f}s"
+              f"{total['producer_blocked']:>18.2f}s  {bottleneck}")
+
+def days_in_month(month):
+    """Number of days in a month of the synthetic calendar (simplified)"""
+    if month == 2:
+        return 28
+    return 31 if month in [1, 3, 5, 7, 8, 10, 12] else 30
+
+def season_adjustment(climate_type, month):
+    """Temperature offset for a month (northern hemisphere seasons)"""
+    if climate_type == "Tropical":
+        return 0
+    if month in [12, 1, 2]:  # Winter
+        return -10
+    if month in [6, 7, 8]:  # Summer
+        return 10
+    return 0
 
-    print("Inserting locations data...")
+def _season_table(months):
+    """Seasonal adjustment per (climate, month) for months 1..months"""
+    return np.array([
+        [season_adjustment(name, month) for month in range(1, months + 1)]
+        for name in CLIMATE_NAMES
+    ])
+
+# Counter slots reserved per row; no row draws more values than this
+DRAWS_PER_ROW = 16
+
+def city_keys(seed, table, codes):
+    """Random keys of (seed, table, location code) for each code"""
+    words = np.array([code.encode('utf-8') for code in codes], dtype='S16').view(np.uint64).reshape(-1, 2)
+    return _splitmix64(_splitmix64(words[:, 0] ^ stable_key(seed, table)) ^ words[:, 1])
+
+class RowRandom:
+    """Counter-based random draws for the rows of a block of cities.
+
+    Draw number `slot` of row `row` of a city is a pure function of (seed,
+    table, location code, row, slot), so the rows of any city come out
+    byte-identical whichever chunk, worker or run generates them.
+    """
+
+    def __init__(self, seed, table, codes, rows_per_city=1, rows=None):
+        # rows picks which of each city's row numbers to draw for (default: all of them)
+        rows = np.arange(rows_per_city) if rows is None else np.asarray(rows)
+        self.keys = np.repeat(city_keys(seed, table, codes), len(rows))
+        self.counters = np.tile(rows.astype(np.uint64) * np.uint64(DRAWS_PER_ROW), len(codes))
+        self.slot = 0
+
+    def random(self):
+        """Next uniform draw in [0, 1) for every row"""
+        if self.slot >= DRAWS_PER_ROW:
+            raise RuntimeError("rows drew more than DRAWS_PER_ROW values")
+        draws = hash_uniform(self.keys, self.counters + np.uint64(self.slot))
+        self.slot += 1
+        return draws
+
+    def integers(self, low, high):
+        """Next integer draw in [low, high] inclusive for every row"""
+        # The scaled draw is never negative, so truncating is flooring
+        return low + (self.random() * (np.asarray(high) - low + 1)).astype(np.int64)
+
+def _precipitation(draws, probability):
+    return np.where(draws.random() < probability, draws.integers(0, 100), 0)
+
+def _statuses(draws):
+    return TokenColumn.strings(WEATHER_STATUSES, draws.integers(0, len(WEATHER_STATUSES) - 1))
+
+def location_flags(seed, block):
+    """Enabled and trashed flags of a block of cities, as boolean arrays"""
+    draws = RowRandom(seed, 'locations', block.codes)
+    enabled = draws.random() < 0.8  # 80% enabled
+    trashed = np.where(draws.random() < 0.8, ~enabled, draws.random() < 0.5)
+    return enabled, trashed
+
+def location_chunk(seed, block):
+    """Generate one locations chunk"""
+    enabled, trashed = location_flags(seed, block)
+    every = np.arange(len(block))
+
+    return RowChunk('locations', [
+        TokenColumn.strings(block.codes, every),
+        TokenColumn.strings(block.city_names, every),
+        TokenColumn.strings(block.region_names, every),
+        TokenColumn.strings(block.country_names, every),
+        TokenColumn.strings(block.country_codes, every),
+        TokenColumn.booleans(enabled),
+        TokenColumn.booleans(trashed),
+    ])
+
+def realtime_chunk(seed, block, now, max_age_minutes=60):
+    """Generate one realtime_weather chunk, last updated up to max_age_minutes before now"""
+    codes, climates = block.codes, block.climates
+    draws = RowRandom(seed, 'realtime_weather', codes)
+    bounds = CLIMATE_BOUNDS[climates]
+
+    temperature = draws.integers(bounds[:, 2], bounds[:, 3])
+    humidity = draws.integers(30, 95)
+    precipitation = _precipitation(draws, 0.3)
+    wind_speed = draws.integers(0, 80)
+    status = _statuses(draws)
+    minutes_ago = draws.integers(0, max_age_minutes)
+    update_times = [now - datetime.timedelta(minutes=minutes) for minutes in range(max_age_minutes + 1)]
+
+    return RowChunk('realtime_weather', [
+        TokenColumn.strings(codes, np.arange(len(codes))),
+        TokenColumn.integers(temperature),
+        TokenColumn.integers(humidity),
+        TokenColumn.integers(precipitation),
+        TokenColumn.integers(wind_speed),
+        status,
+        TokenColumn.timestamps(update_times, minutes_ago),
+    ])
+
+def daily_chunk(seed, block, months, only_month=None):
+    """Generate one weather_daily chunk covering every day of every month, or of only_month"""
+    codes, climates = block.codes, block.climates
+    month_of_day = np.concatenate([np.full(days_in_month(month), month) for month in range(1, months + 1)])
+    day_of_month = np.concatenate([np.arange(1, days_in_month(month) + 1) for month in range(1, months + 1)])
+    rows = np.arange(len(month_of_day))
+    if only_month is not None:
+        rows = rows[month_of_day == only_month]
+    per_city = len(rows)
+    draws = RowRandom(seed, 'weather_daily', codes, rows=rows)
+
+    city = np.repeat(np.arange(len(codes)), per_city)
+    month = np.tile(month_of_day[rows], len(codes))
+    bounds = CLIMATE_BOUNDS[climates][city]
+    adjustment = _season_table(months)[climates[city], month - 1]
+
+    min_temp = draws.integers(bounds[:, 0], bounds[:, 1]) + adjustment
+    max_temp = draws.integers(bounds[:, 2], bounds[:, 3]) + adjustment
+
+    # Ensure max_temp > min_temp
+    max_temp = np.maximum(max_temp, min_temp + draws.integers(3, 10))
+
+    return RowChunk('weather_daily', [
+        TokenColumn.integers(np.tile(day_of_month[rows], len(codes))),
+        TokenColumn.integers(month),
+        TokenColumn.strings(codes, city),
+        TokenColumn.integers(min_temp),
+        TokenColumn.integers(max_temp),
+        TokenColumn.integers(_precipitation(draws, 0.3)),
+        _statuses(draws),
+    ])
+
+def hourly_chunk(seed, block):
+    """Generate one weather_hourly chunk with 24 hours per city"""
+    codes, climates = block.codes, block.climates
+    bounds = CLIMATE_BOUNDS[climates]
+
+    # Generate a base temperature for the day
+    base_temp = RowRandom(seed, 'weather_hourly:base', codes).integers(
+        bounds[:, 1], bounds[:, 2] + (bounds[:, 3] - bounds[:, 2]) // 2
+    )
 
-    # Use copy_from for faster bulk insert
-    locations_data = io.StringIO()
-    for city in cities_data:
-        code, city_name, region_name, country_name, country_code, _ = city
-        enabled = random.choice([True, False, True, True, True])  # 80% enabled
-        trashed = not enabled if random.random() < 0.8 else random.choice([True, False])
+    # Temperature varies by hour (cooler at night, warmer during day)
+    draws = RowRandom(seed, 'weather_hourly', codes, 24)
+    hour = np.tile(np.arange(24), len(codes))
+    daytime = (hour >= 6) & (hour <= 18)
+    hour_adjustment = draws.integers(np.where(daytime, 0, -10), np.where(daytime, 10, 0))
+    city = np.repeat(np.arange(len(codes)), 24)
+
+    return RowChunk('weather_hourly', [
+        TokenColumn.integers(hour),
+        TokenColumn.strings(codes, city),
+        TokenColumn.integers(base_temp[city] + hour_adjustment),
+        TokenColumn.integers(_precipitation(draws, 0.2)),
+        _statuses(draws),
+    ])
+
+# Day 0 of the history draw counters
+HISTORY_EPOCH = datetime.date(1970, 1, 1)
+
+def history_chunk(seed, block, first_day, days):
+    """Generate weather_history rows for a block of cities over `days` calendar days.
+
+    Uses the hourly model (a daily base temperature plus a day/night swing)
+    with the seasonal offset of each real date's month. Rows are ordered by
+    city within the chunk; chunks follow each other in time.
+    """
+    codes, climates = block.codes, block.climates
+    bounds = CLIMATE_BOUNDS[climates]
+    dates = [first_day + datetime.timedelta(days=day) for day in range(days)]
+    day_numbers = (first_day - HISTORY_EPOCH).days + np.arange(days)
+
+    # A base temperature per city and day
+    base_temp = RowRandom(seed, 'weather_history:base', codes, rows=day_numbers).integers(
+        np.repeat(bounds[:, 1], days), np.repeat(bounds[:, 2] + (bounds[:, 3] - bounds[:, 2]) // 2, days)
+    )
 
-        locations_data.write(f"{code}\t{city_name}\t{region_name}\t{country_name}\t{country_code}\t{enabled}\t{trashed}\n")
+    draws = RowRandom(seed, 'weather_history', codes, rows=(day_numbers[:, None] * 24 + np.arange(24)).ravel())
+    city = np.repeat(np.arange(len(codes)), days * 24)
+    day = np.tile(np.repeat(np.arange(days), 24), len(codes))
+    hour = np.tile(np.arange(24), len(codes) * days)
+    daytime = (hour >= 6) & (hour <= 18)
+    hour_adjustment = draws.integers(np.where(daytime, 0, -10), np.where(daytime, 10, 0))
+    months = np.array([date.month for date in dates])
+    adjustment = _season_table(12)[climates[city], months[day] - 1]
+
+    observed_at = [datetime.datetime(date.year, date.month, date.day, h) for date in dates for h in range(24)]
+    return RowChunk('weather_history', [
+        TokenColumn.timestamps(observed_at, day * 24 + hour),
+        TokenColumn.strings(codes, city),
+        TokenColumn.integers(base_temp[city * days + day] + adjustment + hour_adjustment),
+        TokenColumn.integers(_precipitation(draws, 0.2)),
+        _statuses(draws),
+    ])
+
+def generate_history_chunks(catalogue, year):
+    """Chunks of one calendar year of hourly history, in time order"""
+    first_day = datetime.date(year, 1, 1)
+    year_days = (datetime.date(year + 1, 1, 1) - first_day).days
+    # Small catalogues take several days per chunk to keep chunks near CHUNK_ROWS
+    days = max(1, min(year_days, CHUNK_ROWS // (24 * max(len(catalogue), 1))))
+    for day in range(0, year_days, days):
+        span = min(days, year_days - day)
+        for block in catalogue.blocks(24 * span):
+            yield history_chunk(catalogue.seed, block, first_day + datetime.timedelta(days=day), span)
+
+def generate_location_chunks(catalogue):
+    for block in catalogue.blocks():
+        yield location_chunk(catalogue.seed, block)
+
+def generate_realtime_chunks(catalogue, now):
+    for block in catalogue.blocks():
+        yield realtime_chunk(catalogue.seed, block, now)
+
+def daily_rows_per_city(months):
+    return sum(days_in_month(month) for month in range(1, months + 1))
+
+def rows_per_city(table, months=12):
+    """Rows each city contributes to a table"""
+    if table == 'weather_daily':
+        return daily_rows_per_city(months)
+    return 24 if table == 'weather_hourly' else 1
+
+def generate_daily_chunks(catalogue, months=12, only_month=None):
+    per_city = days_in_month(only_month) if only_month else daily_rows_per_city(months)
+    for block in catalogue.blocks(per_city):
+        yield daily_chunk(catalogue.seed, block, months, only_month)
+
+def generate_hourly_chunks(catalogue):
+    for block in catalogue.blocks(24):
+        yield hourly_chunk(catalogue.seed, block)
+
+def generate_table_chunks(table, catalogue, months=12, as_of=None):
+    """Chunks of any of the four tables for the given cities"""
+    if table == 'locations':
+        return generate_location_chunks(catalogue)
+    if table == 'realtime_weather':
+        return generate_realtime_chunks(catalogue, as_of or datetime.datetime.now())
+    if table == 'weather_daily':
+        return generate_daily_chunks(catalogue, months)
+    return generate_hourly_chunks(catalogue)
+
+# Seconds the pipeline consumer waits on an empty queue before checking its producers are still alive
+PIPELINE_POLL_SECONDS = 1.0
+
+class ProducerDone:
+    """A producer's end-of-stream marker: its index, the seconds it spent blocked, and its error if it failed"""
+
+    def __init__(self, producer, blocked, error=None):
+        self.producer = producer
+        self.blocked = blocked
+        self.error = error
+
+def produce_chunks(queue, producer, table, catalogue, months, as_of, copy_format):
+    """Producer process: serialize a range of cities' chunks onto the queue.
+
+    Blocks while the queue is full, and always finishes with a ProducerDone,
+    carrying the traceback if generation failed, so the consumer never waits
+    on a producer that has given up.
+    """
+    blocked = 0.0
+    error = None
+    try:
+        for chunk in generate_table_chunks(table, catalogue, months, as_of):
+            item = EncodedChunk(chunk.encode(copy_format), chunk.row_count, chunk.content_hash())
+            start_time = time.time()
+            queue.put(item)
+            blocked += time.time() - start_time
+    except BaseException:
+        error = traceback.format_exc()
+        raise
+    finally:
+        queue.put(ProducerDone(producer, blocked, error))
+
+class ChunkPipeline:
+    """Chunks generated and serialized by producer processes while COPY sends earlier ones.
+
+    The bounded queue applies backpressure, so at most `depth` chunks wait
+    in memory. Iterating collects metrics: how long the consumer waited on
+    an empty queue (the client is the bottleneck) and how long producers
+    were blocked on a full one (Postgres is the bottleneck).
+    """
+
+    def __init__(self, table, catalogue, months, as_of, copy_format, producers, depth=8):
+        self.table = table
+        self.catalogue = catalogue
+        self.months = months
+        self.as_of = as_of
+        self.copy_format = copy_format
+        self.producers = producers
+        self.depth = depth
+        self.metrics = dict(producers=producers, queue_capacity=depth, chunks=0, queue_depth_total=0,
+                            queue_depth_max=0, consumer_wait=0.0, producer_blocked=0.0)
+
+    def __iter__(self):
+        queue = multiprocessing.Queue(maxsize=self.depth)
+        processes = [
+            multiprocessing.Process(target=produce_chunks, daemon=True,
+                                    args=(queue, producer, self.table, part, self.months, self.as_of,
+                                          self.copy_format))
+            for producer, part in enumerate(self.catalogue.split(self.producers))
+        ]
+        for process in processes:
+            process.start()
+
+        metrics = self.metrics
+        running = set(range(len(processes)))
+        suspects = set()
+        try:
+            while running:
+                try:
+                    depth = queue.qsize()
+                except NotImplementedError:  # macOS
+                    depth = 0
+                start_time = time.time()
+                try:
+                    item = queue.get(timeout=PIPELINE_POLL_SECONDS)
+                except Empty:
+                    # A producer that exited without its marker was killed; give its last
+                    # items one more poll to arrive before giving up on it
+                    dead = {producer for producer in running if not processes[producer].is_alive()}
+                    if dead & suspects:
+                        producer = min(dead & suspects)
+                        raise RuntimeError(f"{self.table} pipeline producer {producer} died "
+                                           f"(exit code {processes[producer].exitcode}) before finishing")
+                    suspects = dead
+                    continue
+                waited = time.time() - start_time
+
+                if isinstance(item, ProducerDone):
+                    if item.error:
+                        raise RuntimeError(f"{self.table} pipeline producer {item.producer} failed:\n{item.error}")
+                    metrics['producer_blocked'] += item.blocked
+                    running.discard(item.producer)
+                    continue
+                metrics['consumer_wait'] += waited
+                metrics['chunks'] += 1
+                metrics['queue_depth_total'] += depth
+                metrics['queue_depth_max'] = max(metrics['queue_depth_max'], depth)
+                yield item
+        finally:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+                process.join()
+
+def table_chunks(table, catalogue, copy_format, pipeline=None, months=12, as_of=None):
+    """Chunks for COPY, generated inline or pre-serialized by a (producers, depth) pipeline"""
+    if pipeline:
+        return ChunkPipeline(table, catalogue, months, as_of, copy_format, *pipeline)
+    return generate_table_chunks(table, catalogue, months, as_of)
+
+def _key_columns(table):
+    """Primary key columns of a table, from TABLE_PRIMARY_KEYS"""
+    key = TABLE_PRIMARY_KEYS[table]
+    return tuple(key[key.index('(') + 1:key.rindex(')')].split(', '))
+
+def _count_inserted(rows, inserted_keys, key_positions, rejected):
+    """Diff the keys an INSERT returned against its rows; rows left over were conflicts"""
+    inserted = collections.Counter(map(tuple, inserted_keys))
+    count = 0
+    for row in rows:
+        key = tuple(row[position] for position in key_positions)
+        if inserted[key]:
+            inserted[key] -= 1
+            count += 1
+        else:
+            rejected.append((row, "duplicate key"))
+    return count
+
+def _stage_rows(cursor, staging, columns, statement, chunk):
+    """COPY a chunk into the staging table and move it over in one INSERT.
+
+    Returns the keys the INSERT returned, or None when either step failed;
+    the savepoint is then rolled back so the chunk can be retried row-wise.
+    """
+    cursor.execute("SAVEPOINT fallback")
+    try:
+        cursor.copy_expert(f"COPY {staging} ({', '.join(columns)}) FROM STDIN WITH (FORMAT binary)",
+                           CopyStream([chunk], 'binary'), size=COPY_CHUNK_SIZE)
+        cursor.execute(statement)
+        inserted_keys = cursor.fetchall()
+        cursor.execute("RELEASE SAVEPOINT fallback")
+        return inserted_keys
+    except psycopg2.Error:
+        cursor.execute("ROLLBACK TO SAVEPOINT fallback")
+        cursor.execute("RELEASE SAVEPOINT fallback")
+        return None
+
+def _insert_rows(cursor, statement, rows, key_positions, rejected, depth=0):
+    """Insert rows under a savepoint with multi-row INSERTs; returns the number inserted.
+
+    Rows whose key already exists are skipped by the statement and found
+    by diffing the keys it returns. Any other error bisects the batch, down
+    to FALLBACK_MAX_DEPTH halvings, after which the whole remaining slice
+    is rejected. Rejected rows are appended to rejected with their error.
+    """
+    cursor.execute("SAVEPOINT fallback")
+    try:
+        inserted_keys = execute_values(cursor, statement, rows, page_size=FALLBACK_PAGE_SIZE, fetch=True)
+        cursor.execute("RELEASE SAVEPOINT fallback")
+    except psycopg2.Error as e:
+        cursor.execute("ROLLBACK TO SAVEPOINT fallback")
+        cursor.execute("RELEASE SAVEPOINT fallback")
+        if len(rows) == 1 or depth >= FALLBACK_MAX_DEPTH:
+            error = str(e).strip().splitlines()[0]
+            rejected.extend((row, error) for row in rows)
+            return 0
+
+        middle = len(rows) // 2
+        return (_insert_rows(cursor, statement, rows[:middle], key_positions, rejected, depth + 1)
+                + _insert_rows(cursor, statement, rows[middle:], key_positions, rejected, depth + 1))
+
+    return _count_inserted(rows, inserted_keys, key_positions, rejected)
+
+def insert_fallback(conn, table, columns, chunks, total_rows, key_table=None):
+    """Insert chunks with multi-row INSERTs when COPY has failed, one transaction per chunk.
+
+    The chunks are the same deterministic ones COPY was sent, so the rows
+    match. Each chunk is COPYed into an unconstrained temporary table and
+    moved over by one INSERT that skips rows whose key is already loaded;
+    if that fails, the chunk is retried with multi-row INSERTs that isolate
+    the offending rows by bisection. Skipped rows are reported while the
+    rest of their chunk still goes in. key_table names the table whose
+    primary key applies when table is a partition. Returns the rows inserted.
+    """
+    print("Falling back to batched inserts...")
+    cursor = conn.cursor()
+    key_columns = _key_columns(key_table or table)
+    key_positions = [columns.index(column) for column in key_columns]
+    conflict = f"ON CONFLICT DO NOTHING RETURNING {', '.join(key_columns)}"
+    statement = f"INSERT INTO {table} ({', '.join(columns)}) VALUES %s {conflict}"
+    staging = f"fallback_{table}"
+    cursor.execute(f"CREATE TEMP TABLE {staging} ON COMMIT DELETE ROWS AS "
+                   f"SELECT {', '.join(columns)} FROM {table} WITH NO DATA")
+    conn.commit()
+    staged = (f"INSERT INTO {table} ({', '.join(columns)}) SELECT {', '.join(columns)} FROM {staging} "
+              f"{conflict}")
+    inserted = 0
+    rejected = []
+    content_hash = 0
+    start_time = time.time()
+
+    with tqdm(total=total_rows, unit='rows') as progress:
+        for chunk in chunks:
+            rows = list(chunk.rows())
+            first_rejected = len(rejected)
+            inserted_keys = _stage_rows(cursor, staging, columns, staged, chunk)
+            if inserted_keys is None:
+                inserted += _insert_rows(cursor, statement, rows, key_positions, rejected)
+            else:
+                inserted += _count_inserted(rows, inserted_keys, key_positions, rejected)
+            conn.commit()
+            skipped = {row for row, _ in rejected[first_rejected:]}
+            kept = np.array([row not in skipped for row in rows], dtype=bool)
+            content_hash = (content_hash + int(chunk.row_hashes()[kept].sum(dtype=np.uint64))) % (1 << 64)
+            progress.update(len(rows))
+    cursor.execute(f"DROP TABLE {staging}")
+    conn.commit()
+    cursor.close()
+    COPY_STATS.append(dict(table=table, format='insert', rows=inserted, bytes=0, seconds=time.time() - start_time,
+                           hash=content_hash))
+
+    if rejected:
+        print(f"Skipped {len(rejected)} {table} rows that could not be inserted:")
+        for row, error in rejected[:FALLBACK_REPORT_ROWS]:
+            print(f"  {row}: {error}")
+        if len(rejected) > FALLBACK_REPORT_ROWS:
+            print(f"  ... and {len(rejected) - FALLBACK_REPORT_ROWS} more")
+    return inserted
+
+def insert_locations(conn, catalogue, copy_format='text', freeze=False, pipeline=None):
+    """Insert locations data"""
+    cursor = conn.cursor()
 
-    locations_data.seek(0)
+    print("Inserting locations data...")
 
     try:
-        cursor.copy_from(
-            locations_data,
-            'locations',
-            columns=('code', 'city_name', 'region_name', 'country_name', 'country_code', 'enabled', 'trashed'),
-            sep='\t'
-        )
+        if freeze:
+            cursor.execute("TRUNCATE locations")
+        total_records = copy_chunks(cursor, 'locations', LOCATION_COLUMNS,
+                                    table_chunks('locations', catalogue, copy_format, pipeline), copy_format, freeze,
+                                    (catalogue.start, catalogue.stop))
         conn.commit()
     except Exception as e:
         conn.rollback()
         print(f"Error inserting locations: {e}")
         # Fall back to regular inserts if COPY fails
-        print("Falling back to regular inserts...")
-        for city in tqdm(cities_data):
-            code, city_name, region_name, country_name, country_code, _ = city
-            enabled = random.choice([True, False, True, True, True])  # 80% enabled
-            trashed = not enabled if random.random() < 0.8 else random.choice([True, False])
-
-            cursor.execute(
-                "INSERT INTO locations (code, city_name, region_name, country_name, country_code, enabled, trashed) VALUES (%s, %s, %s, %s, %s, %s, %s)",
-                (code, city_name, region_name, country_name, country_code, enabled, trashed)
-            )
-        conn.commit()
+        total_records = insert_fallback(conn, 'locations', LOCATION_COLUMNS, generate_location_chunks(catalogue),
+                                        len(catalogue))
 
     cursor.close()
-    print(f"Inserted {len(cities_data)} locations.")
+    print(f"Inserted {total_records} locations.")
+    return total_records
 
-def insert_realtime_weather(conn, cities_data):
-    """Insert realtime weather data"""
+def insert_realtime_weather(conn, catalogue, copy_format='text', freeze=False, as_of=None, pipeline=None):
+    """Insert realtime weather data, last updated within the hour before as_of"""
+    now = as_of or datetime.datetime.now()
     cursor = conn.cursor()
 
     print("Inserting realtime weather data...")
 
-    # Use copy_from for faster bulk insert
-    realtime_data = io.StringIO()
+    try:
+        if freeze:
+            cursor.execute("TRUNCATE realtime_weather")
+        total_records = copy_chunks(cursor, 'realtime_weather', REALTIME_COLUMNS,
+                                    table_chunks('realtime_weather', catalogue, copy_format, pipeline, as_of=now),
+                                    copy_format, freeze, (catalogue.start, catalogue.stop))
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        print(f"Error inserting realtime weather: {e}")
+        # Fall back to regular inserts
+        total_records = insert_fallback(conn, 'realtime_weather', REALTIME_COLUMNS,
+                                        generate_realtime_chunks(catalogue, now), len(catalogue))
 
-    now = datetime.datetime.now()
+    cursor.close()
+    print(f"Inserted realtime weather data for {total_records} locations.")
+    return total_records
 
-    for city in cities_data:
-        code, _, _, _, _, climate_type = city
+def insert_daily_weather(conn, catalogue, months=12, copy_format='text', freeze=False, pipeline=None):
+    """Insert daily weather forecasts for multiple months"""
+    cursor = conn.cursor()
 
-        climate = CLIMATE_TYPES[climate_type]
-        temp_range = climate["max_temp_range"]
+    print(f"Inserting daily weather data for {months} months...")
 
-        temperature = random.randint(temp_range[0], temp_range[1])
-        humidity = random.randint(30, 95)
-        precipitation = random.randint(0, 100) if random.random() < 0.3 else 0
-        wind_speed = random.randint(0, 80)
-        status = random.choice(WEATHER_STATUSES)
-        last_updated = now - datetime.timedelta(minutes=random.randint(0, 60))
+    try:
+        if freeze:
+            cursor.execute("TRUNCATE weather_daily")
+        total_records = copy_chunks(cursor, 'weather_daily', DAILY_COLUMNS,
+                                    table_chunks('weather_daily', catalogue, copy_format, pipeline, months),
+                                    copy_format, freeze, (catalogue.start, catalogue.stop))
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        print(f"Error bulk inserting daily weather: {e}")
+        total_records = insert_fallback(conn, 'weather_daily', DAILY_COLUMNS, generate_daily_chunks(catalogue, months),
+                                        daily_rows_per_city(months) * len(catalogue))
 
-        realtime_data.write(f"{code}\t{temperature}\t{humidity}\t{precipitation}\t{wind_speed}\t{status}\t{last_updated}\n")
+    cursor.close()
+    print(f"Inserted {total_records} daily weather records.")
+    return total_records
 
-    realtime_data.seek(0)
+def insert_hourly_weather(conn, catalogue, copy_format='text', freeze=False, pipeline=None):
+    """Insert hourly weather forecasts"""
+    cursor = conn.cursor()
+
+    print("Inserting hourly weather data...")
 
     try:
-        cursor.copy_from(
-            realtime_data,
-            'realtime_weather',
-            columns=('location_code', 'temperature', 'humidity', 'precipitation', 'wind_speed', 'status', 'last_updated'),
-            sep='\t'
-        )
+        if freeze:
+            cursor.execute("TRUNCATE weather_hourly")
+        total_records = copy_chunks(cursor, 'weather_hourly', HOURLY_COLUMNS,
+                                    table_chunks('weather_hourly', catalogue, copy_format, pipeline),
+                                    copy_format, freeze, (catalogue.start, catalogue.stop))
         conn.commit()
     except Exception as e:
         conn.rollback()
-        print(f"Error inserting realtime weather: {e}")
+        print(f"Error inserting hourly weather: {e}")
         # Fall back to regular inserts
-        print("Falling back to regular inserts...")
+        total_records = insert_fallback(conn, 'weather_hourly', HOURLY_COLUMNS, generate_hourly_chunks(catalogue),
+                                        24 * len(catalogue))
+
+    cursor.close()
+    print(f"Inserted {total_records} hourly weather records ({len(catalogue)} locations, 24 hours each).")
+    return total_records
+
+def zipf_ranks(rng, count, skew, size):
+    """Draw ranks 0..count-1 from a bounded Zipf distribution by inverting its continuous CDF"""
+    u = rng.random(size)
+    if skew == 0:
+        ranks = u * count
+    elif skew == 1:
+        ranks = np.power(count + 1.0, u) - 1
+    else:
+        ranks = np.power((np.power(count + 1.0, 1 - skew) - 1) * u + 1, 1 / (1 - skew)) - 1
+    return np.minimum(ranks.astype(np.int64), count - 1)
+
+def distinct_zipf_ranks(rng, count, skew, size):
+    """Draw `size` distinct Zipf ranks, since a row may only be upserted once per statement"""
+    ranks = np.unique(zipf_ranks(rng, count, skew, size))
+    for _ in range(100):
+        if len(ranks) >= size:
+            break
+        ranks = np.unique(np.concatenate([ranks, zipf_ranks(rng, count, skew, size - len(ranks))]))
+    return ranks[:size]
+
+def _coprime_stride(count):
+    """A stride coprime to count, so rank * stride % count visits every index once"""
+    stride = 2654435761 % count or 1
+    while math.gcd(stride, count) != 1:
+        stride += 1
+    return stride
+
+def percentile(values, fraction):
+    return float(np.percentile(values, fraction * 100)) if len(values) else 0.0
+
+def run_live_updates(conn, catalogue, rate, duration=0, interval=0.1, skew=1.0,
+                     burst_factor=1.0, burst_every=60, burst_length=5):
+    """Upsert realtime_weather rows continuously at a target rate until duration or Ctrl-C.
+
+    Each tick COPYs the due updates into a temporary staging table and
+    merges them with INSERT ... ON CONFLICT DO UPDATE in one transaction.
+    Locations are picked uniformly (skew 0) or Zipf-skewed over a fixed
+    shuffle of the catalogue, and the rate is multiplied by burst_factor
+    for burst_length seconds out of every burst_every.
+    """
+    cursor = conn.cursor()
+    cursor.execute("CREATE TEMP TABLE realtime_weather_staging (LIKE realtime_weather) ON COMMIT DELETE ROWS")
+    conn.commit()
 
-        now = datetime.datetime.now()
+    columns = ', '.join(REALTIME_COLUMNS)
+    updates = ', '.join(f"{column} = EXCLUDED.{column}" for column in REALTIME_COLUMNS[1:])
+    merge = (f"INSERT INTO realtime_weather ({columns}) SELECT {columns} FROM realtime_weather_staging "
+             f"ON CONFLICT (location_code) DO UPDATE SET {updates}")
+
+    rng = np.random.default_rng(catalogue.seed)
+    stride = _coprime_stride(len(catalogue))
+    latencies = []
+    total_updates = 0
+    batch = 0
+    due = 0.0
+
+    print(f"Streaming realtime updates at {rate}/sec (skew {skew}, burst x{burst_factor} "
+          f"for {burst_length}s every {burst_every}s), Ctrl-C to stop...")
+    start_time = last_tick = last_report = time.time()
+    try:
+        while not duration or time.time() - start_time < duration:
+            now = time.time()
+            in_burst = (now - start_time) % burst_every < burst_length
+            due += (now - last_tick) * rate * (burst_factor if in_burst else 1.0)
+            last_tick = now
+
+            count = int(due)
+            if count:
+                due -= count
+                ranks = distinct_zipf_ranks(rng, len(catalogue), skew, min(count, len(catalogue)))
+                block = catalogue.select(catalogue.start + ranks * stride % len(catalogue))
+                chunk = realtime_chunk(stable_key(catalogue.seed, 'live', batch), block,
+                                       datetime.datetime.now(), max_age_minutes=0)
+
+                batch_start = time.time()
+                cursor.copy_expert(f"COPY realtime_weather_staging ({columns}) FROM STDIN WITH (FORMAT binary)",
+                                   CopyStream([chunk], 'binary'), size=COPY_CHUNK_SIZE)
+                cursor.execute(merge)
+                conn.commit()
+                latencies.append(time.time() - batch_start)
+                total_updates += len(block)
+                batch += 1
+
+            if now - last_report >= 5:
+                print(f"{total_updates} updates, {total_updates / (now - start_time):,.0f}/sec achieved, "
+                      f"p99 commit {percentile(latencies[-1000:], 0.99) * 1000:.1f} ms")
+                last_report = now
+
+            time.sleep(max(0.0, interval - (time.time() - now)))
+    except KeyboardInterrupt:
+        conn.rollback()
 
-        for city in tqdm(cities_data):
-            code, _, _, _, _, climate_type = city
+    cursor.close()
+    elapsed = time.time() - start_time
+    print("\n----- Live Update Summary -----")
+    print(f"Duration: {elapsed:.2f} seconds, batches: {batch}, updates: {total_updates}")
+    print(f"Achieved rate: {total_updates / max(elapsed, 1e-9):,.0f} updates/sec (target {rate}/sec)")
+    print(f"Commit latency: p50 {percentile(latencies, 0.5) * 1000:.1f} ms, "
+          f"p95 {percentile(latencies, 0.95) * 1000:.1f} ms, p99 {percentile(latencies, 0.99) * 1000:.1f} ms")
+    return total_updates
+
+def connect(db_params):
+    """Open a connection with UTF-8 client encoding"""
+    conn = psycopg2.connect(**db_params)
+    conn.set_client_encoding('UTF8')
+    return conn
+
+def seed_weather_partition(worker, db_params, catalogue, months, copy_format='text', as_of=None, pipeline=None):
+    """Load the weather tables for one range of cities over its own connection.
+
+    Runs in a worker process; returns (worker, cities, rows, seconds, COPY stats).
+    """
+    conn = connect(db_params)
+    first_stat = len(COPY_STATS)  # a forked worker inherits the parent's stats
+    start_time = time.time()
+    try:
+        rows = insert_realtime_weather(conn, catalogue, copy_format, as_of=as_of, pipeline=pipeline)
+        rows += insert_daily_weather(conn, catalogue, months, copy_format, pipeline=pipeline)
+        rows += insert_hourly_weather(conn, catalogue, copy_format, pipeline=pipeline)
+    finally:
+        conn.close()
 
-            climate = CLIMATE_TYPES[climate_type]
-            temp_range = climate["max_temp_range"]
+    return worker, len(catalogue), rows, time.time() - start_time, COPY_STATS[first_stat:]
+
+def seed_weather_parallel(db_params, catalogue, months, workers, copy_format='text', as_of=None, pipeline=None):
+    """Load the weather tables for all cities across a pool of worker processes"""
+    partitions = catalogue.split(workers)
+    print(f"Loading weather tables with {len(partitions)} workers...")
+
+    with ProcessPoolExecutor(max_workers=len(partitions)) as pool:
+        futures = [
+            pool.submit(seed_weather_partition, worker, db_params, partition, months, copy_format, as_of, pipeline)
+            for worker, partition in enumerate(partitions)
+        ]
+        results = [future.result() for future in futures]
+
+    print("\n----- Worker Throughput -----")
+    for worker, city_count, rows, duration, stats in results:
+        COPY_STATS.extend(stats)
+        print(f"Worker {worker}: {city_count} cities, {rows} rows in {duration:.2f} seconds "
+              f"({rows / max(duration, 1e-9):,.0f} rows/sec)")
+
+    return sum(result[2] for result in results)
+
+def encode_cities(table, catalogue, months, as_of, copy_format):
+    """Serialize one table's rows for a range of cities; returns (payload, rows, content hash)"""
+    chunks = list(generate_table_chunks(table, catalogue, months, as_of))
+    return (b''.join(chunk.encode(copy_format) for chunk in chunks),
+            sum(chunk.row_count for chunk in chunks),
+            sum(chunk.content_hash() for chunk in chunks) % (1 << 64))
+
+async def async_chunks(executor, table, catalogue, months, as_of, copy_format, stat):
+    """Yield a sub-load's COPY data chunk by chunk, serializing the next chunks in the executor meanwhile"""
+    loop = asyncio.get_running_loop()
+    size = max(1, CHUNK_ROWS // rows_per_city(table, months))
+    parts = (catalogue.subset(start, min(start + size, catalogue.stop))
+             for start in range(catalogue.start, catalogue.stop, size))
+    pending = collections.deque(
+        loop.run_in_executor(executor, encode_cities, table, part, months, as_of, copy_format)
+        for part in [next(parts, None) for _ in range(ASYNC_PREFETCH)] if part is not None
+    )
+
+    if copy_format == 'binary':
+        stat['bytes'] += len(PGCOPY_HEADER)
+        yield PGCOPY_HEADER
+    while pending:
+        payload, rows, content_hash = await pending.popleft()
+        part = next(parts, None)
+        if part is not None:
+            pending.append(loop.run_in_executor(executor, encode_cities, table, part, months, as_of, copy_format))
+        stat['rows'] += rows
+        stat['bytes'] += len(payload)
+        stat['hash'] = (stat['hash'] + content_hash) % (1 << 64)
+        yield payload
+    if copy_format == 'binary':
+        stat['bytes'] += len(PGCOPY_TRAILER)
+        yield PGCOPY_TRAILER
+
+def fallback_sub_load(db_params, table, catalogue, months, as_of):
+    """Insert a failed async sub-load through the batched fallback on its own connection"""
+    conn = connect(db_params)
+    try:
+        return insert_fallback(conn, table, COPY_COLUMNS[table], generate_table_chunks(table, catalogue, months, as_of),
+                               rows_per_city(table, months) * len(catalogue))
+    finally:
+        conn.close()
+
+async def copy_sub_load(pool, executor, db_params, table, catalogue, months, as_of, copy_format):
+    """COPY one table's rows for a range of cities over a pooled connection; returns the rows loaded"""
+    stat = dict(table=table, format=copy_format, rows=0, bytes=0, hash=0)
+    try:
+        async with pool.acquire() as conn:
+            start_time = time.time()
+            await conn.copy_to_table(table, columns=list(COPY_COLUMNS[table]), format=copy_format,
+                                     source=async_chunks(executor, table, catalogue, months, as_of, copy_format, stat))
+    except asyncpg.PostgresError as e:
+        print(f"Error copying {table} for cities {catalogue.start}-{catalogue.stop - 1}: {e}")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, fallback_sub_load, db_params, table, catalogue, months, as_of)
+
+    COPY_STATS.append(dict(stat, seconds=time.time() - start_time))
+    return stat['rows']
+
+async def copy_table_async(pool, executor, db_params, table, catalogue, months, as_of, copy_format, sub_loads):
+    """Load a table as concurrent sub-loads over city ranges; returns the seconds it took"""
+    start_time = time.time()
+    parts = catalogue.split(sub_loads)
+    rows = await asyncio.gather(*(
+        copy_sub_load(pool, executor, db_params, table, part, months, as_of, copy_format) for part in parts
+    ))
+    duration = time.time() - start_time
+    print(f"Loaded {sum(rows)} {table} rows in {duration:.2f} seconds ({len(parts)} sub-loads)")
+    return duration
+
+async def seed_async(db_params, catalogue, months, as_of, copy_format='text', pool_size=4, workers=1):
+    """Load all four tables over an asyncpg connection pool.
+
+    Once locations is committed, the three weather tables and each of their
+    per-city-range sub-loads run concurrently, so the run takes about as
+    long as the largest table. Chunks are serialized in a pool of worker
+    processes so the event loop only moves bytes; the pool has at least one
+    process per pooled connection, so no COPY waits on a shared producer.
+    """
+    if asyncpg is None:
+        raise RuntimeError("--async-load needs asyncpg (pip install asyncpg)")
+
+    pool = await asyncpg.create_pool(host=db_params['host'], port=db_params['port'], user=db_params['user'],
+                                     password=db_params['password'], database=db_params['dbname'],
+                                     min_size=1, max_size=pool_size)
+    print(f"Loading data for {len(catalogue)} cities over {pool_size} async connections...")
+    try:
+        with ProcessPoolExecutor(max_workers=max(workers, pool_size)) as executor:
+            await copy_table_async(pool, executor, db_params, 'locations', catalogue, months, as_of,
+                                   copy_format, pool_size)
+
+            start_time = time.time()
+            durations = await asyncio.gather(*(
+                copy_table_async(pool, executor, db_params, table, catalogue, months, as_of, copy_format, pool_size)
+                for table in FOREIGN_KEY_TABLES
+            ))
+            print(f"Weather tables loaded concurrently in {time.time() - start_time:.2f} seconds "
+                  f"(largest table {max(durations):.2f}s, sum of tables {sum(durations):.2f}s)")
+    finally:
+        await pool.close()
+
+def hash_remainders(conn, table, modulus, catalogue):
+    """Hash partition remainder of every city in the catalogue, as Postgres computes it"""
+    cursor = conn.cursor()
+    remainders = []
+    for block in catalogue.blocks():
+        cursor.execute("""
+            SELECT r.remainder FROM unnest(%s::varchar[]) WITH ORDINALITY AS c(code, position)
+            CROSS JOIN LATERAL (
+                SELECT remainder FROM generate_series(0, %s - 1) remainder
+                WHERE satisfies_hash_partition(%s::regclass, %s, remainder, c.code) LIMIT 1
+            ) r
+            ORDER BY c.position
+        """, (block.codes, modulus, table, modulus))
+        remainders.extend(row[0] for row in cursor.fetchall())
+    conn.commit()
+    cursor.close()
+    return np.array(remainders, dtype=np.int64)
 
-            temperature = random.randint(temp_range[0], temp_range[1])
-            humidity = random.randint(30, 95)
-            precipitation = random.randint(0, 100) if random.random() < 0.3 else 0
-            wind_speed = random.randint(0, 80)
-            status = random.choice(WEATHER_STATUSES)
-            last_updated = now - datetime.timedelta(minutes=random.randint(0, 60))
+def partition_chunks(table, catalogue, months, only_month=None):
+    if only_month:
+        return generate_daily_chunks(catalogue, months, only_month)
+    return generate_table_chunks(table, catalogue, months)
 
-            cursor.execute(
-                "INSERT INTO realtime_weather (location_code, temperature, humidity, precipitation, wind_speed, status, last_updated) VALUES (%s, %s, %s, %s, %s, %s, %s)",
-                (code, temperature, humidity, precipitation, wind_speed, status, last_updated)
-            )
+def load_partition(db_params, table, partition, catalogue, months, copy_format='text', freeze=False, only_month=None):
+    """COPY one partition's rows straight into it over its own connection.
 
+    Runs in a worker process; returns (partition, rows, seconds, COPY stats).
+    """
+    conn = connect(db_params)
+    first_stat = len(COPY_STATS)  # a forked worker inherits the parent's stats
+    start_time = time.time()
+    cursor = conn.cursor()
+    try:
+        if freeze:
+            cursor.execute(f"TRUNCATE {partition}")
+        rows = copy_chunks(cursor, partition, COPY_COLUMNS[table], partition_chunks(table, catalogue, months, only_month),
+                           copy_format, freeze)
         conn.commit()
+    except Exception as e:
+        conn.rollback()
+        print(f"Error loading {partition}: {e}")
+        per_city = days_in_month(only_month) if only_month else rows_per_city(table, months)
+        rows = insert_fallback(conn, partition, COPY_COLUMNS[table],
+                               partition_chunks(table, catalogue, months, only_month), per_city * len(catalogue),
+                               table)
+    finally:
+        conn.close()
 
-    cursor.close()
-    print(f"Inserted realtime weather data for {len(cities_data)} locations.")
+    # Report under the parent table, so hashes compare with the flat layout
+    stats = [dict(stat, table=table) for stat in COPY_STATS[first_stat:]]
+    return partition, rows, time.time() - start_time, stats
+
+def load_partitions(db_params, conn, layout, catalogue, months, copy_format='text', freeze=False, workers=1):
+    """Route each partitioned table's rows to their partitions and load the partitions in parallel.
+
+    Hash routing asks Postgres for each city's remainder up front, so every
+    partition is generated from just its own cities; month partitions
+    generate just their month's rows.
+    """
+    loads = []
+    for table, (partition_by, partitions) in layout.items():
+        if partition_by.startswith("HASH"):
+            remainders = hash_remainders(conn, table, len(partitions), catalogue)
+            for partition, _, remainder in partitions:
+                selection = CitySelection(catalogue, catalogue.start + np.flatnonzero(remainders == remainder))
+                loads.append((table, partition, selection, None))
+        else:
+            loads.extend((table, partition, catalogue, month) for partition, _, month in partitions if month <= months)
+
+    print(f"Loading {len(loads)} partitions with {workers} workers...")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(load_partition, db_params, table, partition, cities, months, copy_format, freeze, only_month)
+            for table, partition, cities, only_month in loads
+        ]
+        results = [future.result() for future in futures]
+
+    print("\n----- Partition Throughput -----")
+    for partition, rows, duration, stats in results:
+        COPY_STATS.extend(stats)
+        print(f"{partition}: {rows} rows in {duration:.2f} seconds ({rows / max(duration, 1e-9):,.0f} rows/sec)")
+
+    return sum(result[1] for result in results)
+
+# The Spring repositories' forecast lookups, timed by --lookup-samples
+LOOKUP_QUERIES = {
+    # DailyWeatherRepository.findByLocationCode
+    'daily by location': """
+        SELECT d.* FROM weather_daily d JOIN locations l ON l.code = d.location_code
+        WHERE d.location_code = %(code)s AND NOT l.trashed""",
+    # HourlyWeatherRepository.findByLocationCodeAndHour
+    'hourly by location and hour': """
+        SELECT h.* FROM weather_hourly h JOIN locations l ON l.code = h.location_code
+        WHERE h.location_code = %(code)s AND h.hour_of_day > %(hour)s AND NOT l.trashed""",
+}
 
-def insert_daily_weather(conn, cities_data, months=12):
-    """Insert daily weather forecasts for multiple months"""
+def measure_lookups(conn, catalogue, samples, queries=LOOKUP_QUERIES):
+    """Time the lookups for random cities and print their latency percentiles.
+
+    A lookup given as a list of queries runs them in turn and is timed as one.
+    """
+    rng = np.random.default_rng(catalogue.seed)
+    codes = catalogue.select(rng.integers(catalogue.start, catalogue.stop, samples)).codes
+    hours = rng.integers(0, 24, samples).tolist()
     cursor = conn.cursor()
 
-    print(f"Inserting daily weather data for {months} months...")
+    print("\n----- Lookup Latency -----")
+    for name, query in queries.items():
+        statements = [query] if isinstance(query, str) else query
+        latencies = []
+        for code, hour in zip(codes, hours):
+            start_time = time.perf_counter()
+            for statement in statements:
+                cursor.execute(statement, dict(code=code, hour=hour))
+                cursor.fetchall()
+            latencies.append(time.perf_counter() - start_time)
+        print(f"{name:<30} p50 {percentile(latencies, 0.5) * 1000:.2f} ms, "
+              f"p95 {percentile(latencies, 0.95) * 1000:.2f} ms, p99 {percentile(latencies, 0.99) * 1000:.2f} ms")
 
-    # For each city, generate daily weather for each month
-    daily_data = io.StringIO()
+    conn.commit()
+    cursor.close()
 
-    total_records = 0
+# Denormalized full-weather read model: one JSONB document per non-trashed location, shaped like
+# FullWeatherDTO, plus the locations touched since it was last refreshed
+READ_MODEL_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS full_weather_snapshot (
+        location_code VARCHAR(12) PRIMARY KEY,
+        document JSONB NOT NULL,
+        refreshed_at TIMESTAMP NOT NULL DEFAULT now()
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS full_weather_dirty (
+        location_code VARCHAR(12) PRIMARY KEY,
+        change_id BIGSERIAL
+    )
+    """,
+]
 
-    for city in cities_data:
-        code, _, _, _, _, climate_type = city
-        climate = CLIMATE_TYPES[climate_type]
+# Statement-level triggers mark every location code a write touches; the code column is the trigger argument
+READ_MODEL_TRIGGER_FUNCTION = """
+    CREATE OR REPLACE FUNCTION full_weather_touch() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            EXECUTE format('INSERT INTO full_weather_dirty (location_code) SELECT DISTINCT %I FROM new_rows '
+                           'ON CONFLICT (location_code) DO UPDATE SET change_id = EXCLUDED.change_id', TG_ARGV[0]);
+        END IF;
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            EXECUTE format('INSERT INTO full_weather_dirty (location_code) SELECT DISTINCT %I FROM old_rows '
+                           'ON CONFLICT (location_code) DO UPDATE SET change_id = EXCLUDED.change_id', TG_ARGV[0]);
+        END IF;
+        RETURN NULL;
+    END
+    $$
+"""
+
+READ_MODEL_SOURCES = {
+    'locations': 'code',
+    'realtime_weather': 'location_code',
+    'weather_daily': 'location_code',
+    'weather_hourly': 'location_code',
+}
 
-        for month in range(1, months + 1):
-            # Determine days in month (simplified)
-            days_in_month = 31 if month in [1, 3, 5, 7, 8, 10, 12] else 30
-            if month == 2:
-                days_in_month = 28
+# Transition tables allow one event per trigger
+READ_MODEL_EVENTS = {
+    'insert': 'REFERENCING NEW TABLE AS new_rows',
+    'update': 'REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows',
+    'delete': 'REFERENCING OLD TABLE AS old_rows',
+}
 
-            for day in range(1, days_in_month + 1):
-                # Adjust temperature ranges by month (northern hemisphere seasons)
-                season_adjustment = 0
-                if climate_type != "Tropical":
-                    if month in [12, 1, 2]:  # Winter
-                        season_adjustment = -10
-                    elif month in [6, 7, 8]:  # Summer
-                        season_adjustment = 10
+# Documents of the non-trashed locations selected by {where}, as FullWeatherController renders them
+READ_MODEL_DOCUMENTS = """
+    SELECT l.code,
+           jsonb_build_object(
+               'location', l.city_name || ', ' || coalesce(l.region_name || ', ', '') || l.country_name,
+               'hourly_forecast', coalesce(h.forecast, '[]'::jsonb),
+               'daily_forecast', coalesce(d.forecast, '[]'::jsonb)
+           ) || CASE WHEN r.location_code IS NULL THEN '{{}}'::jsonb ELSE jsonb_build_object(
+               'realtime_weather', jsonb_build_object(
+                   'temperature', r.temperature, 'humidity', r.humidity, 'precipitation', r.precipitation,
+                   'wind_speed', r.wind_speed, 'status', r.status,
+                   'last_updated', to_char(r.last_updated, 'YYYY-MM-DD"T"HH24:MI:SS"Z"'))) END
+    FROM locations l
+    LEFT JOIN realtime_weather r ON r.location_code = l.code
+    LEFT JOIN (
+        SELECT location_code, jsonb_agg(jsonb_build_object(
+                   'hour_of_day', hour_of_day, 'temperature', temperature,
+                   'precipitation', precipitation, 'status', status) ORDER BY hour_of_day) AS forecast
+        FROM weather_hourly WHERE {where_hourly} GROUP BY location_code
+    ) h ON h.location_code = l.code
+    LEFT JOIN (
+        SELECT location_code, jsonb_agg(jsonb_build_object(
+                   'day_of_month', day_of_month, 'month', month, 'min_temp', min_temp, 'max_temp', max_temp,
+                   'precipitation', precipitation, 'status', status) ORDER BY month, day_of_month) AS forecast
+        FROM weather_daily WHERE {where_daily} GROUP BY location_code
+    ) d ON d.location_code = l.code
+    WHERE NOT l.trashed AND {where}
+"""
+
+def create_read_model(conn):
+    """Create the snapshot and dirty tables and the triggers feeding the dirty table"""
+    cursor = conn.cursor()
+    for statement in READ_MODEL_TABLES:
+        cursor.execute(statement)
+    cursor.execute(READ_MODEL_TRIGGER_FUNCTION)
+    for table, column in READ_MODEL_SOURCES.items():
+        for event, referencing in READ_MODEL_EVENTS.items():
+            cursor.execute(f"DROP TRIGGER IF EXISTS full_weather_{event} ON {table}")
+            cursor.execute(f"CREATE TRIGGER full_weather_{event} AFTER {event.upper()} ON {table} {referencing} "
+                           f"FOR EACH STATEMENT EXECUTE FUNCTION full_weather_touch('{column}')")
+    conn.commit()
+    cursor.close()
 
-                min_range = climate["min_temp_range"]
-                max_range = climate["max_temp_range"]
+def rebuild_read_model(conn):
+    """Rebuild every snapshot document from scratch; returns (documents, seconds)"""
+    create_read_model(conn)
+    cursor = conn.cursor()
+    start_time = time.time()
+    cursor.execute("TRUNCATE full_weather_snapshot, full_weather_dirty")
+    cursor.execute("INSERT INTO full_weather_snapshot (location_code, document) " +
+                   READ_MODEL_DOCUMENTS.format(where='true', where_hourly='true', where_daily='true'))
+    documents = cursor.rowcount
+    cursor.execute("ANALYZE full_weather_snapshot")
+    conn.commit()
+    cursor.close()
+    return documents, time.time() - start_time
 
-                min_temp = random.randint(min_range[0], min_range[1]) + season_adjustment
-                max_temp = random.randint(max_range[0], max_range[1]) + season_adjustment
+def refresh_read_model(conn):
+    """Rebuild the documents of the locations touched since the last refresh; returns (touched, seconds).
 
-                # Ensure max_temp > min_temp
-                max_temp = max(max_temp, min_temp + random.randint(3, 10))
+    Dirty entries are only cleared if their change_id is unchanged, so a
+    location written to while the refresh runs stays dirty for the next one.
+    """
+    cursor = conn.cursor()
+    start_time = time.time()
+    cursor.execute("CREATE TEMPORARY TABLE touched ON COMMIT DROP AS SELECT * FROM full_weather_dirty")
+    touched = cursor.rowcount
+    touched_codes = "location_code IN (SELECT location_code FROM touched)"
+    cursor.execute("DELETE FROM full_weather_snapshot WHERE " + touched_codes)
+    cursor.execute("INSERT INTO full_weather_snapshot (location_code, document) " +
+                   READ_MODEL_DOCUMENTS.format(where='l.code IN (SELECT location_code FROM touched)',
+                                               where_hourly=touched_codes, where_daily=touched_codes))
+    cursor.execute("DELETE FROM full_weather_dirty d USING touched t "
+                   "WHERE d.location_code = t.location_code AND d.change_id = t.change_id")
+    conn.commit()
+    cursor.close()
+    return touched, time.time() - start_time
+
+# FullWeatherService.get: the location, then its realtime, hourly and daily rows, against the one snapshot row
+READ_MODEL_QUERIES = {
+    'full weather assembled': [
+        "SELECT * FROM locations WHERE code = %(code)s AND NOT trashed",
+        "SELECT * FROM realtime_weather WHERE location_code = %(code)s",
+        "SELECT * FROM weather_hourly WHERE location_code = %(code)s",
+        "SELECT * FROM weather_daily WHERE location_code = %(code)s",
+    ],
+    'full weather snapshot': "SELECT document FROM full_weather_snapshot WHERE location_code = %(code)s",
+}
 
-                precipitation = random.randint(0, 100) if random.random() < 0.3 else 0
-                status = random.choice(WEATHER_STATUSES)
+def relation_size(cursor, relation):
+    cursor.execute("SELECT pg_relation_size(%s)", (relation,))
+    return cursor.fetchone()[0]
 
-                daily_data.write(f"{day}\t{month}\t{code}\t{min_temp}\t{max_temp}\t{precipitation}\t{status}\n")
-                total_records += 1
+def seed_history(conn, catalogue, years, first_year, copy_format='text'):
+    """Append `years` calendar years of hourly observations to weather_history, one COPY per year.
 
-    daily_data.seek(0)
+    The BRIN index on observed_at is built (and the table analyzed) after
+    the load; the table size, index size and load throughput are reported
+    per year.
+    """
+    cursor = conn.cursor()
+    cursor.execute(HISTORY_TABLE)
+    conn.commit()
+    print(f"Loading {years} years of hourly history for {len(catalogue)} cities from {first_year}...")
 
-    try:
-        cursor.copy_from(
-            daily_data,
-            'weather_daily',
-            columns=('day_of_month', 'month', 'location_code', 'min_temp', 'max_temp', 'precipitation', 'status'),
-            sep='\t'
-        )
+    results = []
+    table_size = relation_size(cursor, 'weather_history')
+    for year in range(first_year, first_year + years):
+        rows = copy_chunks(cursor, 'weather_history', HISTORY_COLUMNS, generate_history_chunks(catalogue, year),
+                           copy_format)
         conn.commit()
-    except Exception as e:
-        conn.rollback()
-        print(f"Error bulk inserting daily weather: {e}")
-        print("Daily weather data is too large for bulk insert, using batch inserts instead...")
-
-        batch_size = 1000
-        daily_values = []
-
-        for city in tqdm(cities_data):
-            code, _, _, _, _, climate_type = city
-            climate = CLIMATE_TYPES[climate_type]
-
-            for month in range(1, months + 1):
-                # Determine days in month (simplified)
-                days_in_month = 31 if month in [1, 3, 5, 7, 8, 10, 12] else 30
-                if month == 2:
-                    days_in_month = 28
-
-                for day in range(1, days_in_month + 1):
-                    # Adjust temperature ranges by month (northern hemisphere seasons)
-                    season_adjustment = 0
-                    if climate_type != "Tropical":
-                        if month in [12, 1, 2]:  # Winter
-                            season_adjustment = -10
-                        elif month in [6, 7, 8]:  # Summer
-                            season_adjustment = 10
-
-                    min_range = climate["min_temp_range"]
-                    max_range = climate["max_temp_range"]
-
-                    min_temp = random.randint(min_range[0], min_range[1]) + season_adjustment
-                    max_temp = random.randint(max_range[0], max_range[1]) + season_adjustment
-
-                    # Ensure max_temp > min_temp
-                    max_temp = max(max_temp, min_temp + random.randint(3, 10))
-
-                    precipitation = random.randint(0, 100) if random.random() < 0.3 else 0
-                    status = random.choice(WEATHER_STATUSES)
-
-                    daily_values.append((day, month, code, min_temp, max_temp, precipitation, status))
-
-                    # Execute in batches
-                    if len(daily_values) >= batch_size:
-                        args_str = ','.join(cursor.mogrify("(%s,%s,%s,%s,%s,%s,%s)", x).decode('utf-8') for x in daily_values)
-                        cursor.execute("INSERT INTO weather_daily (day_of_month, month, location_code, min_temp, max_temp, precipitation, status) VALUES " + args_str)
-                        conn.commit()
-                        daily_values = []
-
-        # Insert remaining values
-        if daily_values:
-            args_str = ','.join(cursor.mogrify("(%s,%s,%s,%s,%s,%s,%s)", x).decode('utf-8') for x in daily_values)
-            cursor.execute("INSERT INTO weather_daily (day_of_month, month, location_code, min_temp, max_temp, precipitation, status) VALUES " + args_str)
-            conn.commit()
-
+        stat = COPY_STATS[-1]
+        size = relation_size(cursor, 'weather_history')
+        results.append((year, rows, stat['bytes'], stat['seconds'], size - table_size))
+        table_size = size
+        print(f"Loaded {year}: {rows} rows in {stat['seconds']:.2f} seconds")
+
+    start_time = time.time()
+    cursor.execute(HISTORY_INDEX)
+    cursor.execute("ANALYZE weather_history")
+    conn.commit()
+    index_seconds = time.time() - start_time
+    index_size = relation_size(cursor, 'idx_weather_history_observed_at')
+    cursor.execute("SELECT count(*), min(observed_at), max(observed_at) FROM weather_history")
+    total_rows, first, last = cursor.fetchone()
     cursor.close()
-    print(f"Inserted {total_records} daily weather records.")
 
-def insert_hourly_weather(conn, cities_data):
-    """Insert hourly weather forecasts"""
+    print("\n----- History Load -----")
+    print(f"{'year':<8}{'rows':>12}{'seconds':>10}{'rows/sec':>14}{'MB/sec':>10}{'table MB':>11}")
+    for year, rows, byte_count, seconds, size in results:
+        seconds = max(seconds, 1e-9)
+        print(f"{year:<8}{rows:>12}{seconds:>10.2f}{rows / seconds:>14,.0f}{byte_count / 1e6 / seconds:>10.1f}"
+              f"{size / 1e6:>11.1f}")
+    print(f"weather_history: {total_rows} rows from {first} to {last}, {table_size / 1e6:.1f} MB")
+    print(f"BRIN index on observed_at: {index_size / 1e3:.1f} kB, built and analyzed in {index_seconds:.2f} seconds")
+    return sum(result[1] for result in results)
+
+def run_id(catalogue, months, as_of):
+    """Identifier of a seed run: everything that decides which rows it generates and how they hash"""
+    key = stable_key(GENERATOR_VERSION, catalogue.seed, catalogue.count, months, catalogue.country_skew,
+                     catalogue.region_skew, catalogue.climate_bias, as_of.isoformat())
+    return f"{key:016x}"
+
+def latest_seed_run(conn, catalogue=None, months=None, as_of=None):
+    """Parameters of the most recently started checkpointed run, or None.
+
+    Given a catalogue and months, only runs generating those cities are
+    considered, and with as_of also only runs as of that time.
+    """
     cursor = conn.cursor()
+    cursor.execute("SELECT to_regclass('seed_runs') IS NOT NULL")
+    if not cursor.fetchone()[0]:
+        return None
+    conditions, params = [], []
+    if catalogue is not None:
+        conditions.append("seed = %s AND city_count = %s AND months = %s AND country_skew = %s "
+                          "AND region_skew = %s AND climate_bias = %s")
+        params += [catalogue.seed, catalogue.count, months, catalogue.country_skew, catalogue.region_skew,
+                   catalogue.climate_bias]
+    if as_of is not None:
+        conditions.append("as_of = %s")
+        params.append(as_of)
+    cursor.execute(f"""
+        SELECT seed, city_count, months, country_skew, region_skew, climate_bias, as_of, checkpoint_cities
+        FROM seed_runs {'WHERE ' + ' AND '.join(conditions) if conditions else ''}
+        ORDER BY started_at DESC LIMIT 1
+    """, params)
+    run = cursor.fetchone()
+    conn.commit()
+    cursor.close()
+    return run
 
-    print("Inserting hourly weather data...")
+def load_checkpoint(db_params, run, table, cities, months, as_of, copy_format='text'):
+    """COPY one table's rows for a city range and record it in seed_progress, in one transaction.
 
-    # For each city, generate 24 hours of weather data
-    hourly_data = io.StringIO()
+    Runs in a worker process. A failure rolls back both, so the range is
+    simply loaded again on --resume; returns (table, rows, COPY stats).
+    """
+    conn = connect(db_params)
+    first_stat = len(COPY_STATS)  # a forked worker inherits the parent's stats
+    try:
+        cursor = conn.cursor()
+        rows = copy_chunks(cursor, table, COPY_COLUMNS[table], generate_table_chunks(table, cities, months, as_of),
+                           copy_format)
+        cursor.execute(
+            "INSERT INTO seed_progress (run_id, table_name, first_city, stop_city, row_count, content_hash) "
+            "VALUES (%s, %s, %s, %s, %s, %s)",
+            (run, table, cities.start, cities.stop, rows, f"{COPY_STATS[-1]['hash']:016x}")
+        )
+        conn.commit()
+    finally:
+        conn.close()
 
-    for city in cities_data:
-        code, _, _, _, _, climate_type = city
-        climate = CLIMATE_TYPES[climate_type]
+    return table, rows, COPY_STATS[first_stat:]
 
-        # Generate a base temperature for the day
-        base_temp = random.randint(
-            climate["min_temp_range"][1],
-            climate["max_temp_range"][0] + (climate["max_temp_range"][1] - climate["max_temp_range"][0]) // 2
-        )
+def seed_checkpointed(db_params, conn, catalogue, months, as_of, copy_format='text', checkpoint_cities=10000,
+                      workers=1, resume=False):
+    """Load every table in city-range chunks, each committed with its seed_progress row.
 
-        # Generate weather for each hour
-        for hour in range(24):
-            # Temperature varies by hour (cooler at night, warmer during day)
-            hour_adjustment = 0
-            if 6 <= hour <= 18:  # Daytime
-                hour_adjustment = random.randint(0, 10)
-            else:  # Nighttime
-                hour_adjustment = random.randint(-10, 0)
+    Rows are a pure function of the run's parameters, so with resume the
+    chunks already recorded are skipped and the rest load exactly as they
+    would have. Without resume the run's old progress is forgotten.
+    """
+    run = run_id(catalogue, months, as_of)
+    cursor = conn.cursor()
+    for statement in SEED_PROGRESS_TABLES:
+        cursor.execute(statement)
+    cursor.execute("SELECT checkpoint_cities FROM seed_runs WHERE run_id = %s", (run,))
+    recorded = cursor.fetchone()
+    if resume:
+        # Resuming never starts a run of its own, which would reload finished chunks
+        if recorded is None:
+            conn.rollback()
+            raise ValueError(f"--resume found no recorded run {run}")
+        checkpoint_cities = recorded[0]  # the ranges must line up with the finished ones
+    else:
+        cursor.execute("DELETE FROM seed_progress WHERE run_id = %s", (run,))
+        cursor.execute("DELETE FROM seed_runs WHERE run_id = %s", (run,))
+        cursor.execute("""
+            INSERT INTO seed_runs (run_id, seed, city_count, months, country_skew, region_skew, climate_bias,
+                                   as_of, checkpoint_cities)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, (run, catalogue.seed, catalogue.count, months, catalogue.country_skew, catalogue.region_skew,
+              catalogue.climate_bias, as_of, checkpoint_cities))
+    cursor.execute("SELECT table_name, first_city FROM seed_progress WHERE run_id = %s", (run,))
+    finished = set(cursor.fetchall())
+    conn.commit()
+    cursor.close()
 
-            temperature = base_temp + hour_adjustment
-            precipitation = random.randint(0, 100) if random.random() < 0.2 else 0
-            status = random.choice(WEATHER_STATUSES)
+    ranges = [catalogue.subset(start, min(start + checkpoint_cities, catalogue.stop))
+              for start in range(catalogue.start, catalogue.stop, checkpoint_cities)]
+    total = len(ranges) * len(COPY_COLUMNS)
+    print(f"{'Resuming' if resume else 'Starting'} run {run}: {len(finished)} of {total} chunks of "
+          f"{checkpoint_cities} cities already loaded")
+
+    loaded = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Locations first so the weather tables' foreign keys hold
+        for tables in (['locations'], FOREIGN_KEY_TABLES):
+            futures = [
+                pool.submit(load_checkpoint, db_params, run, table, cities, months, as_of, copy_format)
+                for table in tables for cities in ranges if (table, cities.start) not in finished
+            ]
+            for future in futures:
+                table, rows, stats = future.result()
+                COPY_STATS.extend(stats)
+                loaded += 1
+                print(f"Checkpoint {len(finished) + loaded}/{total}: {rows} {table} rows")
+
+    return loaded
+
+# Unlogged helper mapping each location code to its CLIMATE_NAMES index, which locations does not store
+SERVER_CLIMATES_TABLE = "CREATE UNLOGGED TABLE seed_location_climates (code VARCHAR(12), climate INTEGER)"
+
+def _sql_random(slot, key='key'):
+    """SQL for uniform draw `slot` in [0, 1) of each row: 48 hashed bits of (seq, slot) under the city's key"""
+    return (f"((hashint8extended(seq * {DRAWS_PER_ROW} + {slot}, {key}) & {(1 << 48) - 1})::float8 "
+            f"/ {1 << 48})")
+
+def _sql_integers(slot, low, high, key='key'):
+    """SQL for integer draw `slot` in [low, high] inclusive, as RowRandom.integers"""
+    return f"({low} + floor({_sql_random(slot, key)} * (({high}) - ({low}) + 1))::int)"
+
+def _sql_values(rows):
+    return ', '.join(f"({', '.join(map(str, row))})" for row in rows)
+
+def server_side_statements(months):
+    """INSERT ... SELECT statements generating each weather table inside Postgres.
+
+    They restate the climate model of realtime_chunk, daily_chunk and
+    hourly_chunk in SQL, with the climate bounds, seasonal adjustments and
+    calendar passed in as VALUES lists built from the same Python tables.
+    Draws hash (table, location code, row, slot) with the seed, so a seed
+    reproduces the same rows, though not the same ones the client generates.
+    Each statement covers the location codes in [%(first)s, %(stop)s).
+    """
+    climates = _sql_values((i,) + tuple(int(bound) for bound in CLIMATE_BOUNDS[i]) for i in range(len(CLIMATE_NAMES)))
+    seasons = _sql_values((climate, month + 1, int(adjustment))
+                          for climate, row in enumerate(_season_table(months)) for month, adjustment in enumerate(row))
+    calendar, first_row = [], 0
+    for month in range(1, months + 1):
+        calendar.append((month, first_row, days_in_month(month)))
+        first_row += days_in_month(month)
+    status = "(%(statuses)s)[1 + {}]"
+
+    cities = f"""
+        WITH cities AS (
+            SELECT l.code, s.climate, b.min_low, b.min_high, b.max_low, b.max_high,
+                   hashtextextended(%(table)s || ':' || l.code, %(seed)s) AS key,
+                   hashtextextended(%(table)s || ':base:' || l.code, %(seed)s) AS base_key
+            FROM locations l
+            JOIN seed_location_climates s ON s.code = l.code
+            JOIN (VALUES {climates}) AS b(climate, min_low, min_high, max_low, max_high) ON b.climate = s.climate
+            WHERE l.code >= %(first)s AND (%(stop)s IS NULL OR l.code < %(stop)s)
+        )"""
+
+    return {
+        'realtime_weather': f"""{cities}
+            INSERT INTO realtime_weather ({', '.join(REALTIME_COLUMNS)})
+            SELECT code, {_sql_integers(0, 'max_low', 'max_high')}, {_sql_integers(1, 30, 95)},
+                   CASE WHEN {_sql_random(2)} < 0.3 THEN {_sql_integers(3, 0, 100)} ELSE 0 END,
+                   {_sql_integers(4, 0, 80)}, {status.format(_sql_integers(5, 0, len(WEATHER_STATUSES) - 1))},
+                   %(as_of)s::timestamp - make_interval(mins => {_sql_integers(6, 0, 60)})
+            FROM (SELECT cities.*, 0 AS seq FROM cities) AS rows""",
+
+        'weather_daily': f"""{cities}
+            INSERT INTO weather_daily ({', '.join(DAILY_COLUMNS)})
+            SELECT day_of_month, month, code, min_temp,
+                   greatest(max_temp, min_temp + {_sql_integers(2, 3, 10)}),
+                   CASE WHEN {_sql_random(3)} < 0.3 THEN {_sql_integers(4, 0, 100)} ELSE 0 END,
+                   {status.format(_sql_integers(5, 0, len(WEATHER_STATUSES) - 1))}
+            FROM (
+                SELECT c.code, c.key, m.month, d.seq, d.seq - m.first_row + 1 AS day_of_month,
+                       {_sql_integers(0, 'c.min_low', 'c.min_high', 'c.key')} + s.adjustment AS min_temp,
+                       {_sql_integers(1, 'c.max_low', 'c.max_high', 'c.key')} + s.adjustment AS max_temp
+                FROM cities c
+                CROSS JOIN (VALUES {_sql_values(calendar)}) AS m(month, first_row, days)
+                CROSS JOIN LATERAL generate_series(m.first_row, m.first_row + m.days - 1) AS d(seq)
+                JOIN (VALUES {seasons}) AS s(climate, month, adjustment)
+                  ON s.climate = c.climate AND s.month = m.month
+            ) AS rows""",
+
+        'weather_hourly': f"""{cities}
+            INSERT INTO weather_hourly ({', '.join(HOURLY_COLUMNS)})
+            SELECT seq, code,
+                   base_temp + CASE WHEN seq BETWEEN 6 AND 18 THEN {_sql_integers(0, 0, 10)}
+                                    ELSE {_sql_integers(0, -10, 0)} END,
+                   CASE WHEN {_sql_random(1)} < 0.2 THEN {_sql_integers(2, 0, 100)} ELSE 0 END,
+                   {status.format(_sql_integers(3, 0, len(WEATHER_STATUSES) - 1))}
+            FROM (
+                SELECT c.code, c.key, base.temp AS base_temp
+                FROM cities c
+                CROSS JOIN LATERAL (
+                    SELECT {_sql_integers(0, 'c.min_high', 'c.max_low + (c.max_high - c.max_low) / 2', 'c.base_key')}
+                           AS temp
+                    FROM (SELECT 0 AS seq) AS first_row
+                ) AS base
+            ) AS days
+            CROSS JOIN generate_series(0, 23) AS h(seq)""",
+    }
+
+def code_ranges(cursor, parts):
+    """Split the helper table's location codes into at most `parts` contiguous [first, stop) ranges"""
+    cursor.execute("""
+        SELECT min(code) FROM (
+            SELECT code, ntile(%s) OVER (ORDER BY code) AS part FROM seed_location_climates
+        ) AS parts
+        GROUP BY part ORDER BY 1
+    """, (parts,))
+    firsts = [row[0] for row in cursor.fetchall()]
+    return list(zip(firsts, firsts[1:] + [None]))
+
+def run_server_side(db_params, statement, params):
+    """Run one server-side INSERT on its own connection; returns (rows, seconds)"""
+    conn = connect(db_params)
+    try:
+        cursor = conn.cursor()
+        start_time = time.time()
+        cursor.execute(statement, params)
+        rows = cursor.rowcount
+        conn.commit()
+        return rows, time.time() - start_time
+    finally:
+        conn.close()
 
-            hourly_data.write(f"{hour}\t{code}\t{temperature}\t{precipitation}\t{status}\n")
+def seed_server_side(db_params, conn, catalogue, months, as_of, workers=1):
+    """Have Postgres generate the weather tables with generate_series joined to locations.
 
-    hourly_data.seek(0)
+    Locations must already be loaded. Each table is one INSERT ... SELECT
+    per location-code range, the ranges run on `workers` connections at
+    once. Returns {table: (rows, seconds)}.
+    """
+    cursor = conn.cursor()
+    cursor.execute("DROP TABLE IF EXISTS seed_location_climates")
+    cursor.execute(SERVER_CLIMATES_TABLE)
+    chunks = (RowChunk('seed_location_climates', [TokenColumn.strings(block.codes, np.arange(len(block))),
+                                                   TokenColumn.integers(block.climates)])
+              for block in catalogue.blocks())
+    cursor.copy_expert("COPY seed_location_climates (code, climate) FROM STDIN", CopyStream(chunks))
+    cursor.execute("ANALYZE seed_location_climates")
+    conn.commit()
+    ranges = code_ranges(cursor, workers)
 
+    results = {}
     try:
-        cursor.copy_from(
-            hourly_data,
-            'weather_hourly',
-            columns=('hour_of_day', 'location_code', 'temperature', 'precipitation', 'status'),
-            sep='\t'
-        )
+        with ThreadPoolExecutor(max_workers=len(ranges)) as pool:
+            for table, statement in server_side_statements(months).items():
+                print(f"Generating {table} server-side over {len(ranges)} connections...")
+                params = [dict(table=table, seed=catalogue.seed, first=first, stop=stop, as_of=as_of,
+                               statuses=WEATHER_STATUSES) for first, stop in ranges]
+                start_time = time.time()
+                loaded = list(pool.map(lambda p: run_server_side(db_params, statement, p), params))
+                results[table] = (sum(rows for rows, _ in loaded), time.time() - start_time)
+    finally:
+        cursor.execute("DROP TABLE IF EXISTS seed_location_climates")
         conn.commit()
-    except Exception as e:
+        cursor.close()
+    return results
+
+def print_server_side_stats(server, client=None, workers=1):
+    """Server-side generation throughput per table, next to the client COPY path's when it ran"""
+    print(f"\n----- Server-side Generation ({workers} connections) -----")
+    header = f"{'table':<18}{'rows':>10}{'seconds':>10}{'rows/sec':>14}"
+    if client:
+        header += f"{'client s':>10}{'client rows/sec':>17}{'speedup':>9}"
+    print(header)
+    for table, (rows, seconds) in server.items():
+        line = f"{table:<18}{rows:>10}{seconds:>10.2f}{rows / max(seconds, 1e-9):>14,.0f}"
+        if client and table in client:
+            client_rows, client_seconds = client[table]
+            line += (f"{client_seconds:>10.2f}{client_rows / max(client_seconds, 1e-9):>17,.0f}"
+                     f"{client_seconds / max(seconds, 1e-9):>8.1f}x")
+        print(line)
+
+def loaded_row_counts(stats, truncated=None):
+    """Rows per table summed over COPY results, skipping those from before the table was last truncated"""
+    truncated = truncated or {}
+    counts = dict.fromkeys(COPY_COLUMNS, 0)
+    for position, stat in enumerate(stats):
+        if stat['table'] in counts and position >= truncated.get(stat['table'], 0):
+            counts[stat['table']] += stat['rows']
+    return counts
+
+def checkpoint_row_counts(conn, run):
+    """Rows per table recorded in seed_progress for every finished chunk of a checkpointed run"""
+    cursor = conn.cursor()
+    cursor.execute("SELECT table_name, sum(row_count) FROM seed_progress WHERE run_id = %s GROUP BY table_name",
+                   (run,))
+    counts = dict.fromkeys(COPY_COLUMNS, 0)
+    counts.update((table, int(rows)) for table, rows in cursor.fetchall())
+    cursor.close()
+    return counts
+
+def expected_row_counts(catalogue, months):
+    return {table: rows_per_city(table, months) * len(catalogue) for table in COPY_COLUMNS}
+
+# Rows of the sampled locations, fetched through the primary keys (every key column bound) so no table is scanned
+SAMPLE_QUERIES = {
+    'locations': "WHERE code = ANY(%(codes)s)",
+    'realtime_weather': "WHERE location_code = ANY(%(codes)s)",
+    'weather_daily': ("WHERE day_of_month = ANY(%(days)s) AND month = ANY(%(months)s) "
+                      "AND location_code = ANY(%(codes)s)"),
+    'weather_hourly': "WHERE hour_of_day = ANY(%(hours)s) AND location_code = ANY(%(codes)s)",
+}
+
+# Full-scan checks run by --verify-full: {check: query counting the violations}
+FULL_CHECKS = {
+    'daily max_temp <= min_temp': "SELECT count(*) FROM weather_daily WHERE max_temp <= min_temp",
+    'locations without 24 hourly rows': """
+        SELECT count(*) FROM locations l
+        LEFT JOIN (SELECT location_code, count(*) AS hours FROM weather_hourly GROUP BY location_code) h
+          ON h.location_code = l.code
+        WHERE h.hours IS DISTINCT FROM 24""",
+    **{f"{table} orphans": f"""
+        SELECT count(*) FROM {table} t WHERE NOT EXISTS (SELECT 1 FROM locations l WHERE l.code = t.location_code)"""
+       for table in FOREIGN_KEY_TABLES},
+}
+
+def stored_chunk(chunk, rows):
+    """A RowChunk of rows read back from a table, with the column kinds of a generated chunk"""
+    return RowChunk(chunk.table, [TokenColumn(column.kind, list(values), np.arange(len(values)))
+                                  for column, values in zip(chunk.columns, zip(*rows))])
+
+def check_content_hashes(catalogue, months, as_of, splits=(3, 7)):
+    """Check content hashes are independent of chunking; returns the failures found.
+
+    For every table, the hash of the whole catalogue must equal the sum over
+    any split of it, and each generated chunk must hash like its own rows
+    read back, all together and a few on their own, which is what
+    --verify-hashes relies on.
+    """
+    failures = []
+    for table in COPY_COLUMNS:
+        whole = 0
+        for chunk in generate_table_chunks(table, catalogue, months, as_of):
+            whole = (whole + chunk.content_hash()) % (1 << 64)
+            rows, row_hashes = list(chunk.rows()), chunk.row_hashes()
+            if stored_chunk(chunk, rows).content_hash() != chunk.content_hash():
+                failures.append(f"{table}: a chunk hashes unlike its own rows")
+            for i in range(0, len(rows), max(1, len(rows) // 16)):
+                if stored_chunk(chunk, [rows[i]]).content_hash() != int(row_hashes[i]):
+                    failures.append(f"{table}: {rows[i]} hashes differently on its own")
+        for parts in splits:
+            split = sum(chunk.content_hash() for cities in catalogue.split(parts)
+                        for chunk in generate_table_chunks(table, cities, months, as_of)) % (1 << 64)
+            if split != whole:
+                failures.append(f"{table}: {split:016x} over {parts} parts, {whole:016x} whole")
+    return failures
+
+def sample_chunks(catalogue, block, months, as_of):
+    """The generator's rows for a block of sampled cities, per table"""
+    return {
+        'locations': location_chunk(catalogue.seed, block),
+        'realtime_weather': realtime_chunk(catalogue.seed, block, as_of),
+        'weather_daily': daily_chunk(catalogue.seed, block, months),
+        'weather_hourly': hourly_chunk(catalogue.seed, block),
+    }
+
+def verify_sample(db_params, catalogue, cities, sample, months, as_of, hashes=False):
+    """Check a random sample of one city range's locations by primary-key lookups.
+
+    Counts the sampled locations breaking each invariant and, with hashes,
+    the tables whose sampled rows differ from what the generator produces.
+    """
+    rng = np.random.default_rng([catalogue.seed, cities.start])
+    index = np.sort(rng.choice(np.arange(cities.start, cities.stop), min(sample, len(cities)), replace=False))
+    block = catalogue.select(index)
+    params = dict(codes=block.codes, days=list(range(1, 32)), months=list(range(1, months + 1)),
+                  hours=list(range(24)))
+
+    conn = connect(db_params)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SET enable_seqscan = off")
+        rows = {}
+        for table, where in SAMPLE_QUERIES.items():
+            cursor.execute(f"SELECT {', '.join(COPY_COLUMNS[table])} FROM {table} {where}", params)
+            rows[table] = cursor.fetchall()
         conn.rollback()
-        print(f"Error inserting hourly weather: {e}")
-        # Fall back to regular inserts
-        print("Falling back to regular inserts...")
-
-        batch_size = 1000
-        hourly_values = []
-
-        for city in tqdm(cities_data):
-            code, _, _, _, _, climate_type = city
-            climate = CLIMATE_TYPES[climate_type]
-
-            # Generate a base temperature for the day
-            base_temp = random.randint(
-                climate["min_temp_range"][1],
-                climate["max_temp_range"][0] + (climate["max_temp_range"][1] - climate["max_temp_range"][0]) // 2
-            )
-
-            # Generate weather for each hour
-            for hour in range(24):
-                # Temperature varies by hour (cooler at night, warmer during day)
-                hour_adjustment = 0
-                if 6 <= hour <= 18:  # Daytime
-                    hour_adjustment = random.randint(0, 10)
-                else:  # Nighttime
-                    hour_adjustment = random.randint(-10, 0)
-
-                temperature = base_temp + hour_adjustment
-                precipitation = random.randint(0, 100) if random.random() < 0.2 else 0
-                status = random.choice(WEATHER_STATUSES)
-
-                hourly_values.append((hour, code, temperature, precipitation, status))
-
-                # Execute in batches
-                if len(hourly_values) >= batch_size:
-                    args_str = ','.join(cursor.mogrify("(%s,%s,%s,%s,%s)", x).decode('utf-8') for x in hourly_values)
-                    cursor.execute("INSERT INTO weather_hourly (hour_of_day, location_code, temperature, precipitation, status) VALUES " + args_str)
-                    conn.commit()
-                    hourly_values = []
-
-        # Insert remaining values
-        if hourly_values:
-            args_str = ','.join(cursor.mogrify("(%s,%s,%s,%s,%s)", x).decode('utf-8') for x in hourly_values)
-            cursor.execute("INSERT INTO weather_hourly (hour_of_day, location_code, temperature, precipitation, status) VALUES " + args_str)
-            conn.commit()
+    finally:
+        conn.close()
+
+    codes = set(block.codes)
+    located = {row[0] for row in rows['locations']}
+    realtime = {row[0] for row in rows['realtime_weather']}
+    hours = collections.Counter(row[1] for row in rows['weather_hourly'])
+    days = collections.Counter(row[2] for row in rows['weather_daily'])
+    weather_codes = realtime | set(hours) | set(days)
+    result = dict(
+        first=block.codes[0], last=block.codes[-1], sampled=len(codes),
+        violations={
+            'missing location': len(codes - located),
+            'missing realtime_weather': len(codes - realtime),
+            'not 24 hourly rows': sum(hours[code] != 24 for code in codes),
+            f'not {daily_rows_per_city(months)} daily rows': sum(days[code] != daily_rows_per_city(months)
+                                                                  for code in codes),
+            'daily max_temp <= min_temp': len({row[2] for row in rows['weather_daily'] if row[4] <= row[3]}),
+            'orphaned weather rows': len(weather_codes - located),
+        },
+        mismatched=[],
+    )
 
+    if hashes:
+        for table, chunk in sample_chunks(catalogue, block, months, as_of).items():
+            if not rows[table] or stored_chunk(chunk, rows[table]).content_hash() != chunk.content_hash():
+                result['mismatched'].append(table)
+    return result
+
+def foreign_key_status(conn):
+    """Whether each weather table has a validated foreign key to locations, which rules out orphans"""
+    cursor = conn.cursor()
+    status = {}
+    for table in FOREIGN_KEY_TABLES:
+        cursor.execute("""
+            SELECT bool_or(convalidated) FROM pg_constraint
+            WHERE conrelid = %s::regclass AND confrelid = 'locations'::regclass AND contype = 'f'
+        """, (table,))
+        status[table] = bool(cursor.fetchone()[0])
     cursor.close()
-    print(f"Inserted hourly weather data for {len(cities_data)} locations (24 hours each).")
+    return status
+
+def verify_load(db_params, conn, catalogue, months, as_of, loaded, expected=None, sample=0, hashes=False,
+                full=False, workers=1):
+    """Report row counts, invariants and, optionally, sampled content against the generator.
+
+    By default nothing scans a whole table: counts come from the load
+    itself, orphans are ruled out by validated foreign keys, and the other
+    invariants are checked on sampled locations fetched by primary key,
+    one location-code range per connection. Returns the number of failed checks.
+    """
+    failures = 0
+    print("\n----- Verification -----")
+    print(f"{'table':<18}{'loaded':>12}{'expected':>12}  status")
+    for table, rows in loaded.items():
+        wanted = expected.get(table) if expected else None
+        ok = wanted is None or rows == wanted
+        failures += not ok
+        print(f"{table:<18}{rows:>12}{'-' if wanted is None else wanted:>12}  {'ok' if ok else 'MISMATCH'}")
+
+    for table, validated in foreign_key_status(conn).items():
+        status = 'none (foreign key validated)' if validated else 'unchecked (no validated foreign key)'
+        print(f"{table} orphans: {status}")
+
+    if sample:
+        ranges = catalogue.split(workers)
+        per_range = -(-sample // len(ranges))
+        with ThreadPoolExecutor(max_workers=len(ranges)) as pool:
+            results = list(pool.map(
+                lambda cities: verify_sample(db_params, catalogue, cities, per_range, months, as_of, hashes), ranges))
+
+        totals = collections.Counter()
+        for result in results:
+            totals.update(result['violations'])
+        print(f"Sampled {sum(result['sampled'] for result in results)} locations in {len(ranges)} code ranges:")
+        for check, count in totals.items():
+            failures += count > 0
+            print(f"  {check}: {count} {'ok' if count == 0 else 'FAILED'}")
+        if hashes:
+            for result in results:
+                failures += bool(result['mismatched'])
+                status = f"differs in {', '.join(result['mismatched'])}" if result['mismatched'] else 'matches'
+                print(f"  {result['first']}..{result['last']} ({result['sampled']} sampled): generator {status}")
+
+    if full:
+        cursor = conn.cursor()
+        print("Full scans:")
+        for check, query in FULL_CHECKS.items():
+            cursor.execute(query)
+            count = cursor.fetchone()[0]
+            failures += count > 0
+            print(f"  {check}: {count} {'ok' if count == 0 else 'FAILED'}")
+        conn.commit()
+        cursor.close()
+
+    print(f"Verification {'passed' if failures == 0 else f'failed: {failures} checks'}")
+    return failures
+
+def truncate_tables(conn, tables):
+    cursor = conn.cursor()
+    cursor.execute(f"TRUNCATE {', '.join(tables)} CASCADE")
+    conn.commit()
+    cursor.close()
+    for table in (COPY_COLUMNS if 'locations' in tables else tables):
+        TRUNCATED_STATS[table] = len(COPY_STATS)
+
+def load_with_format(conn, tables, copy_format, load):
+    """Run load(copy_format), or with 'compare' load as text, truncate, and load again as binary"""
+    if copy_format != 'compare':
+        return load(copy_format)
+
+    load('text')
+    truncate_tables(conn, tables)
+    return load('binary')
+
+# File extension of each export format, and the manifest written next to the shards
+EXPORT_EXTENSIONS = {'csv': '.csv', 'binary': '.pgcopy'}
+MANIFEST_NAME = 'manifest.json'
+
+def open_shard(path, mode):
+    """Open a shard file, through gzip when its name ends in .gz"""
+    if path.endswith('.gz'):
+        return gzip.open(path, mode, compresslevel=1)
+    return open(path, mode)
+
+def export_shard(output_dir, table, shard, catalogue, months, file_format, compress, as_of):
+    """Write one table's rows for a range of cities to a shard file; returns its manifest entry"""
+    name = f"{table}/{table}-{shard:05d}{EXPORT_EXTENSIONS[file_format]}" + ('.gz' if compress else '')
+    stream = CopyStream(generate_table_chunks(table, catalogue, months, as_of), file_format)
+    start_time = time.time()
+
+    with open_shard(os.path.join(output_dir, name), 'wb') as shard_file:
+        data = stream.read(COPY_CHUNK_SIZE)
+        while data:
+            shard_file.write(data)
+            data = stream.read(COPY_CHUNK_SIZE)
+
+    return dict(file=name, cities=[catalogue.start, catalogue.stop], rows=stream.row_count,
+                bytes=stream.byte_count, hash=f"{stream.content_hash:016x}", seconds=time.time() - start_time)
+
+def export_dataset(output_dir, catalogue, months, as_of, file_format='csv', compress=False, shards=1, workers=1):
+    """Write every table as sharded load files plus a manifest, without a database.
+
+    Each table is split into the same city ranges, and each shard is a
+    complete file COPY can load on its own (binary shards carry their own
+    header and trailer), so they can be loaded in parallel later.
+    """
+    partitions = catalogue.split(shards)
+    for table in COPY_COLUMNS:
+        os.makedirs(os.path.join(output_dir, table), exist_ok=True)
+
+    print(f"Exporting {len(catalogue)} cities to {output_dir} as {len(partitions)} {file_format} shards per table"
+          f"{' (gzip)' if compress else ''}...")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            table: [pool.submit(export_shard, output_dir, table, shard, partition, months, file_format, compress, as_of)
+                    for shard, partition in enumerate(partitions)]
+            for table in COPY_COLUMNS
+        }
+        shard_entries = {table: [future.result() for future in table_futures] for table, table_futures in futures.items()}
+
+    manifest = dict(
+        format=file_format,
+        compression='gzip' if compress else None,
+        seed=catalogue.seed,
+        city_count=len(catalogue),
+        country_skew=catalogue.country_skew,
+        region_skew=catalogue.region_skew,
+        climate_bias=catalogue.climate_bias,
+        months=months,
+        as_of=as_of.isoformat(),
+        tables={
+            table: dict(columns=list(COPY_COLUMNS[table]), rows=sum(entry['rows'] for entry in entries), shards=entries)
+            for table, entries in shard_entries.items()
+        },
+    )
+    with open(os.path.join(output_dir, MANIFEST_NAME), 'w') as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
+
+    stats = [dict(table=table, format=file_format, rows=entry['rows'], bytes=entry['bytes'], seconds=entry['seconds'],
+                  hash=int(entry['hash'], 16))
+             for table, entries in shard_entries.items() for entry in entries]
+    print_copy_stats(stats, 'Export Throughput')
+    return manifest
+
+def load_shard(db_params, input_dir, table, columns, entry, file_format):
+    """COPY one shard file into its table over a new connection; returns (rows, seconds)"""
+    conn = connect(db_params)
+    start_time = time.time()
+    try:
+        cursor = conn.cursor()
+        with open_shard(os.path.join(input_dir, entry['file']), 'rb') as shard_file:
+            cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT {file_format})",
+                               shard_file, size=COPY_CHUNK_SIZE)
+        rows = cursor.rowcount
+        conn.commit()
+    finally:
+        conn.close()
+
+    if rows != entry['rows']:
+        raise ValueError(f"{entry['file']}: loaded {rows} rows, manifest lists {entry['rows']}")
+    return rows, time.time() - start_time
+
+def load_dataset(db_params, input_dir, workers=1):
+    """Stream the shards listed in a manifest into Postgres across a pool of worker processes.
+
+    Locations load first so the weather tables' foreign keys hold; then the
+    shards of all three weather tables share the pool.
+    """
+    with open(os.path.join(input_dir, MANIFEST_NAME)) as manifest_file:
+        manifest = json.load(manifest_file)
+
+    file_format = manifest['format']
+    print(f"Loading {manifest['city_count']} cities from {input_dir} (seed {manifest['seed']}, "
+          f"as of {manifest['as_of']}) with {workers} workers...")
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for tables in (['locations'], FOREIGN_KEY_TABLES):
+            futures = [
+                (table, entry, pool.submit(load_shard, db_params, input_dir, table,
+                                           manifest['tables'][table]['columns'], entry, file_format))
+                for table in tables for entry in manifest['tables'][table]['shards']
+            ]
+            for table, entry, future in futures:
+                rows, seconds = future.result()
+                COPY_STATS.append(dict(table=table, format=file_format, rows=rows, bytes=entry['bytes'],
+                                       seconds=seconds, hash=int(entry['hash'], 16)))
+            for table in tables:
+                print(f"Loaded {manifest['tables'][table]['rows']} {table} rows.")
+
+    return manifest
 
 def main():
+    global DATASET_CACHE
     parser = argparse.ArgumentParser(description='Seed database with weather data.')
     parser.add_argument('--host', default='localhost', help='Database host')
     parser.add_argument('--port', type=int, default=5433, help='Database port')
@@ -461,12 +2785,95 @@ def main():
     parser.add_argument('--dbname', default='weatherdb', help='Database name')
     parser.add_argument('--months', type=int, default=12, help='Number of months of daily data to generate')
     parser.add_argument('--city-count', type=int, default=2000, help='Number of cities to generate')
+    parser.add_argument('--country-skew', type=float, default=1.0,
+                        help='Zipf exponent of cities per country (0 spreads them evenly)')
+    parser.add_argument('--region-skew', type=float, default=0.8,
+                        help='Zipf exponent of cities per region within a country')
+    parser.add_argument('--climate-bias', type=float, default=0.7,
+                        help="Probability that a city has its country's prevailing climate")
+    parser.add_argument('--seed', type=int, help='Random seed; the same seed reproduces the same rows (default: random)')
+    parser.add_argument('--as-of', type=datetime.datetime.fromisoformat,
+                        help='Reference time for realtime last_updated values (default: now)')
+    parser.add_argument('--live', action='store_true',
+                        help='Instead of seeding, stream realtime_weather updates into an already seeded database; '
+                             'without --seed its cities come from the latest checkpointed run')
+    parser.add_argument('--live-rate', type=float, default=1000, help='Target realtime updates per second')
+    parser.add_argument('--live-duration', type=float, default=0, help='Seconds to run (default: until Ctrl-C)')
+    parser.add_argument('--live-interval', type=float, default=0.1, help='Seconds between update batches')
+    parser.add_argument('--live-skew', type=float, default=1.0,
+                        help='Zipf exponent of updated locations (0 picks them uniformly)')
+    parser.add_argument('--live-burst-factor', type=float, default=1.0, help='Rate multiplier during bursts')
+    parser.add_argument('--live-burst-every', type=float, default=60, help='Seconds between burst starts')
+    parser.add_argument('--live-burst-length', type=float, default=5, help='Seconds each burst lasts')
     parser.add_argument('--clean', action='store_true', help='Drop existing tables before creation')
+    parser.add_argument('--workers', type=int, default=1, help='Number of worker processes loading the weather tables')
+    parser.add_argument('--copy-format', choices=['text', 'csv', 'binary', 'compare'], default='text',
+                        help="COPY wire format; 'compare' loads each table as text, then again as binary")
+    parser.add_argument('--pipeline', type=int, default=0,
+                        help='Producer processes generating chunks for each COPY while it runs (default: generate inline)')
+    parser.add_argument('--pipeline-depth', type=int, default=8,
+                        help='Serialized chunks the pipeline queue holds before producers block')
+    parser.add_argument('--async-load', action='store_true',
+                        help='Load with asyncpg over a connection pool, the weather tables concurrently')
+    parser.add_argument('--pool-size', type=int, default=4,
+                        help='Connections in the --async-load pool (also the sub-loads per table and the '
+                             'minimum number of encoding processes)')
+    parser.add_argument('--partition', choices=['none', 'hash', 'month'], default='none',
+                        help='Partition weather_daily and weather_hourly by hash of location_code, '
+                             'or weather_daily by month (use with --clean to replace flat tables)')
+    parser.add_argument('--hash-partitions', type=int, default=8, help='Partitions per table with --partition hash')
+    parser.add_argument('--lookup-samples', type=int, default=0,
+                        help='After seeding, time this many forecast lookups per API query')
+    parser.add_argument('--history-years', type=int, default=0,
+                        help='Instead of seeding, append this many years of hourly observations to weather_history')
+    parser.add_argument('--history-start-year', type=int,
+                        help='First year of --history-years (default: that many years before --as-of)')
+    parser.add_argument('--checkpoint-cities', type=int, default=0,
+                        help='Commit each table in chunks of this many cities, recording each in seed_progress')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue a checkpointed run, skipping finished chunks '
+                             '(the most recent run, or with --seed the most recent one of those parameters)')
+    parser.add_argument('--cache-dir',
+                        help='Cache serialized COPY payloads here, keyed by the generation parameters, '
+                             'and stream repeat seeds from it (needs --seed to ever hit)')
+    parser.add_argument('--cache-max-gb', type=float, default=20, help='Evict cached datasets beyond this total size')
+    parser.add_argument('--cache-max-age-days', type=float, default=7,
+                        help='Evict cached datasets unused for this many days')
+    parser.add_argument('--server-side', action='store_true',
+                        help='Generate the weather tables inside Postgres with generate_series joined to locations, '
+                             'split by location-code range across --workers connections')
+    parser.add_argument('--server-side-compare', action='store_true',
+                        help='With --server-side, first load the weather tables through client COPY and report both')
+    parser.add_argument('--verify-sample', type=int, default=100,
+                        help='Locations checked by primary-key lookups after loading, spread over --workers '
+                             'location-code ranges (0 to skip)')
+    parser.add_argument('--verify-hashes', action='store_true',
+                        help="Also compare the sampled locations' rows with the generator by content hash")
+    parser.add_argument('--verify-full', action='store_true',
+                        help='Also run the invariant and orphan checks as full table scans')
+    parser.add_argument('--check-hashes', action='store_true',
+                        help='Check that content hashes do not depend on how the cities are chunked or split, '
+                             'then exit (needs no database)')
+    parser.add_argument('--read-model', action='store_true',
+                        help='After seeding, build full_weather_snapshot (one JSONB document per location) '
+                             'and the triggers that track touched locations')
+    parser.add_argument('--refresh-read-model', action='store_true',
+                        help='Instead of seeding, rebuild the read model documents of the locations touched '
+                             'since the last build or refresh')
+    parser.add_argument('--bulk-load', action='store_true',
+                        help='Recreate tables unlogged without constraints, COPY FREEZE, then add keys and indexes')
+    parser.add_argument('--output-dir',
+                        help='Instead of loading a database, write sharded load files and a manifest to this directory')
+    parser.add_argument('--file-format', choices=['csv', 'binary'], default='csv',
+                        help='Format of the files written by --output-dir (binary is PGCOPY)')
+    parser.add_argument('--compress', action='store_true', help='Gzip the files written by --output-dir')
+    parser.add_argument('--shards', type=int, help='Files per table written by --output-dir (default: --workers)')
+    parser.add_argument('--load-from', help='Load the shards listed in the manifest of an --output-dir directory')
 
     args = parser.parse_args()
 
     try:
-        conn = psycopg2.connect(
+        db_params = dict(
             host=args.host,
             port=args.port,
             user=args.user,
@@ -474,52 +2881,232 @@ def main():
             dbname=args.dbname
         )
 
-        # Set client encoding to UTF-8
-        conn.set_client_encoding('UTF8')
+        seed = args.seed if args.seed is not None else secrets.randbits(32)
+        catalogue = CityCatalogue(args.city_count, seed=seed, country_skew=args.country_skew,
+                                  region_skew=args.region_skew, climate_bias=args.climate_bias)
+        as_of = args.as_of or datetime.datetime.now().replace(microsecond=0)
+
+        # Offline export and the hash check need no database at all
+        if args.check_hashes:
+            failures = check_content_hashes(catalogue, args.months, as_of)
+            for failure in failures:
+                print(f"  {failure}")
+            print("Content hash check " + ("failed" if failures else "passed"))
+            return 1 if failures else 0
+
+        if args.output_dir:
+            print(f"Seed: {seed}, as of: {as_of.isoformat()} (pass --seed {seed} --as-of {as_of.isoformat()} to reproduce)")
+            export_dataset(args.output_dir, catalogue, args.months, as_of, args.file_format, args.compress,
+                           args.shards or args.workers, args.workers)
+            return 0
+
+        conn = connect(db_params)
+
+        if args.resume:
+            if args.clean or args.bulk_load:
+                raise ValueError("--resume continues into the existing tables; drop --clean and --bulk-load")
+            # The run's as_of is part of its identity, so it comes from the recorded run, never the clock
+            if args.seed is None:
+                run = latest_seed_run(conn)
+            else:
+                run = latest_seed_run(conn, catalogue, args.months, args.as_of)
+            if run is None:
+                raise ValueError("--resume found no checkpointed run to continue"
+                                 + ("" if args.seed is None else " with these parameters"))
+            (seed, args.city_count, args.months, args.country_skew, args.region_skew, args.climate_bias,
+             as_of, args.checkpoint_cities) = run
+            args.as_of = as_of
+            catalogue = CityCatalogue(args.city_count, seed=seed, country_skew=args.country_skew,
+                                      region_skew=args.region_skew, climate_bias=args.climate_bias)
+
+        if args.live:
+            # Updates must follow the seeded cities' climates, so the catalogue comes from the recorded run
+            if args.seed is None:
+                run = latest_seed_run(conn)
+                if run is None:
+                    raise ValueError("--live needs the seeded data's --seed and --city-count when no checkpointed "
+                                     "run is recorded")
+                seed, city_count, _, country_skew, region_skew, climate_bias, _, _ = run
+                catalogue = CityCatalogue(city_count, seed=seed, country_skew=country_skew, region_skew=region_skew,
+                                          climate_bias=climate_bias)
+                print(f"Live updates for the recorded run: seed {seed}, {city_count} cities")
+            cursor = conn.cursor()
+            cursor.execute("SELECT count(*) FROM locations")
+            located = cursor.fetchone()[0]
+            conn.commit()
+            cursor.close()
+            if located != len(catalogue):
+                print(f"Warning: locations holds {located} rows but live updates cover {len(catalogue)} cities; "
+                      f"pass the seeded --city-count")
+            run_live_updates(conn, catalogue, args.live_rate, args.live_duration, args.live_interval,
+                             args.live_skew, args.live_burst_factor, args.live_burst_every, args.live_burst_length)
+            conn.close()
+            return 0
+
+        if args.refresh_read_model:
+            touched, seconds = refresh_read_model(conn)
+            print(f"Refreshed the full-weather read model: {touched} touched locations in {seconds:.2f} seconds")
+            if args.lookup_samples:
+                measure_lookups(conn, catalogue, args.lookup_samples, READ_MODEL_QUERIES)
+            conn.close()
+            return 0
+
+        if args.cache_dir:
+            key = stable_key(GENERATOR_VERSION, seed, args.city_count, args.months, args.country_skew,
+                             args.region_skew, args.climate_bias, args.as_of)
+            DATASET_CACHE = DatasetCache(args.cache_dir, f"{key:016x}", args.cache_max_gb * 1e9,
+                                         args.cache_max_age_days * 86400)
+            DATASET_CACHE.evict()
+            as_of = DATASET_CACHE.as_of(as_of)
+
+        if not args.load_from:
+            print(f"Seed: {seed}, as of: {as_of.isoformat()} (pass --seed {seed} --as-of {as_of.isoformat()} to reproduce)")
+
+        if args.history_years:
+            if args.clean:
+                cursor = conn.cursor()
+                print("Dropping existing history...")
+                cursor.execute("DROP TABLE IF EXISTS weather_history")
+                conn.commit()
+                cursor.close()
+            first_year = args.history_start_year or as_of.year - args.history_years
+            seed_history(conn, catalogue, args.history_years, first_year,
+                         'text' if args.copy_format == 'compare' else args.copy_format)
+            print_copy_stats(COPY_STATS)
+            conn.close()
+            return 0
 
         if args.clean:
             cursor = conn.cursor()
             print("Dropping existing tables...")
-            cursor.execute("DROP TABLE IF EXISTS weather_hourly, weather_daily, realtime_weather, locations CASCADE")
+            cursor.execute("DROP TABLE IF EXISTS weather_hourly, weather_daily, realtime_weather, locations, "
+                           "seed_progress, seed_runs, full_weather_snapshot, full_weather_dirty CASCADE")
             conn.commit()
             cursor.close()
 
         # Create schema
-        create_schema(conn)
+        layout = partition_layout(args.partition, args.hash_partitions)
+        if args.bulk_load:
+            create_bulk_schema(conn, layout)
+        else:
+            create_schema(conn, layout)
 
         # Load city data
         start_time = time.time()
-        print(f"Loading data for {args.city_count} cities...")
-        cities_data = load_cities_data()[:args.city_count]
 
         # Insert data
-        insert_locations(conn, cities_data)
-        insert_realtime_weather(conn, cities_data)
-        insert_daily_weather(conn, cities_data, args.months)
-        insert_hourly_weather(conn, cities_data)
-
-        # Calculate statistics
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM locations")
-        location_count = cursor.fetchone()[0]
-
-        cursor.execute("SELECT COUNT(*) FROM weather_daily")
-        daily_count = cursor.fetchone()[0]
-
-        cursor.execute("SELECT COUNT(*) FROM weather_hourly")
-        hourly_count = cursor.fetchone()[0]
-
-        cursor.close()
+        # Locations go first so the weather tables' foreign keys hold
+        # COPY FREEZE needs the truncate and the load in one transaction, which
+        # parallel workers on other connections cannot share
+        copy_format = args.copy_format
+        freeze = args.bulk_load
+        pipeline = (args.pipeline, args.pipeline_depth) if args.pipeline else None
+        server = None
+        manifest = None
+        if args.load_from:
+            manifest = load_dataset(db_params, args.load_from, args.workers)
+        elif args.checkpoint_cities:
+            seed_checkpointed(db_params, conn, catalogue, args.months, as_of,
+                              'text' if copy_format == 'compare' else copy_format,
+                              args.checkpoint_cities, args.workers, args.resume)
+        elif args.async_load:
+            asyncio.run(seed_async(db_params, catalogue, args.months, as_of,
+                                   'text' if copy_format == 'compare' else copy_format, args.pool_size, args.workers))
+        else:
+            print(f"Loading data for {args.city_count} cities...")
+            load_with_format(conn, ['locations'], copy_format,
+                             lambda fmt: insert_locations(conn, catalogue, fmt, freeze, pipeline))
+            if args.server_side:
+                client = None
+                if args.server_side_compare:
+                    client = {}
+                    client_format = 'text' if copy_format == 'compare' else copy_format
+                    for table, load in (
+                        ('realtime_weather', lambda: insert_realtime_weather(conn, catalogue, client_format, freeze,
+                                                                             as_of, pipeline)),
+                        ('weather_daily', lambda: insert_daily_weather(conn, catalogue, args.months, client_format,
+                                                                       freeze, pipeline)),
+                        ('weather_hourly', lambda: insert_hourly_weather(conn, catalogue, client_format, freeze,
+                                                                         pipeline)),
+                    ):
+                        load_start = time.time()
+                        rows = load()
+                        client[table] = (rows, time.time() - load_start)
+                    truncate_tables(conn, FOREIGN_KEY_TABLES)
+                server = seed_server_side(db_params, conn, catalogue, args.months, as_of, args.workers)
+                print_server_side_stats(server, client, args.workers)
+            else:
+                if layout:
+                    load_with_format(conn, list(layout), copy_format,
+                                     lambda fmt: load_partitions(db_params, conn, layout, catalogue, args.months, fmt,
+                                                                 freeze, args.workers))
+                if args.workers > 1 and not layout:
+                    load_with_format(
+                        conn, ['realtime_weather', 'weather_daily', 'weather_hourly'], copy_format,
+                        lambda fmt: seed_weather_parallel(db_params, catalogue, args.months, args.workers, fmt, as_of,
+                                                          pipeline)
+                    )
+                else:
+                    load_with_format(conn, ['realtime_weather'], copy_format,
+                                     lambda fmt: insert_realtime_weather(conn, catalogue, fmt, freeze, as_of, pipeline))
+                    if 'weather_daily' not in layout:
+                        load_with_format(conn, ['weather_daily'], copy_format,
+                                         lambda fmt: insert_daily_weather(conn, catalogue, args.months, fmt, freeze,
+                                                                          pipeline))
+                    if 'weather_hourly' not in layout:
+                        load_with_format(conn, ['weather_hourly'], copy_format,
+                                         lambda fmt: insert_hourly_weather(conn, catalogue, fmt, freeze, pipeline))
+
+        if args.bulk_load:
+            finish_bulk_load(db_params, layout)
+
+        # Exact row counts from the load itself rather than COUNT(*) scans
+        if args.checkpoint_cities:
+            loaded = checkpoint_row_counts(conn, run_id(catalogue, args.months, as_of))
+        else:
+            loaded = loaded_row_counts(COPY_STATS, TRUNCATED_STATS)
+            loaded.update((table, rows) for table, (rows, _) in (server or {}).items())
 
         end_time = time.time()
         duration = end_time - start_time
 
         print("\n----- Seeding Complete -----")
         print(f"Total duration: {duration:.2f} seconds")
-        print(f"Locations: {location_count}")
-        print(f"Daily weather records: {daily_count}")
-        print(f"Hourly weather records: {hourly_count}")
-        print(f"Total records: {location_count + daily_count + hourly_count + location_count}")
+        print(f"Locations: {loaded['locations']}")
+        print(f"Realtime weather records: {loaded['realtime_weather']}")
+        print(f"Daily weather records: {loaded['weather_daily']}")
+        print(f"Hourly weather records: {loaded['weather_hourly']}")
+        print(f"Total records: {sum(loaded.values())}")
+
+        print_copy_stats(COPY_STATS)
+        print_pipeline_stats(COPY_STATS)
+
+        # A loaded dataset is checked against the parameters it was generated with
+        months = args.months
+        if manifest:
+            catalogue = CityCatalogue(manifest['city_count'], seed=manifest['seed'],
+                                      country_skew=manifest['country_skew'], region_skew=manifest['region_skew'],
+                                      climate_bias=manifest['climate_bias'])
+            months = manifest['months']
+            as_of = datetime.datetime.fromisoformat(manifest['as_of'])
+        hashes = args.verify_hashes and not server
+        if args.verify_hashes and server:
+            print("\nSkipping the generator hash check: --server-side rows are not the client generator's")
+        failures = verify_load(db_params, conn, catalogue, months, as_of, loaded,
+                               expected_row_counts(catalogue, months), args.verify_sample, hashes, args.verify_full,
+                               args.workers)
+
+        if args.read_model:
+            documents, seconds = rebuild_read_model(conn)
+            print(f"\nBuilt the full-weather read model: {documents} documents in {seconds:.2f} seconds")
+
+        if args.lookup_samples:
+            measure_lookups(conn, catalogue, args.lookup_samples)
+            if args.read_model:
+                measure_lookups(conn, catalogue, args.lookup_samples, READ_MODEL_QUERIES)
+
+        if DATASET_CACHE:
+            DATASET_CACHE.evict()
 
         conn.close()
 
@@ -527,7 +3114,7 @@ def main():
         print(f"Error: {e}")
         return 1
 
-    return 0
+    return 1 if failures else 0
 
 if __name__ == "__main__":
     exit(main())
\ No newline at end of file